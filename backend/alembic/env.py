@@ -19,6 +19,16 @@ target_metadata = Base.metadata
 # Inject DB URL from app config
 config.set_main_option("sqlalchemy.url", str(app_config.SQLALCHEMY_DATABASE_URI))
 
+# Full-text search objects are created by hand-written migrations and are not
+# mapped, so autogenerate must not offer to drop them.
+UNMAPPED_SEARCH_OBJECTS = {"search_vector", "ix_notes_search_vector", "notes_fts"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if reflected and compare_to is None and (name in UNMAPPED_SEARCH_OBJECTS or (name or "").startswith("notes_fts_")):
+        return False
+    return True
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
@@ -28,6 +38,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -49,6 +60,7 @@ def run_migrations_online() -> None:
             target_metadata=target_metadata,
             compare_type=True,
             compare_server_default=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,34 @@
+"""added file processing progress
+
+Revision ID: b3c1f0e9a2d4
+Revises: 7a95ce5a356d
+Create Date: 2026-10-18 10:12:31.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c1f0e9a2d4'
+down_revision: Union[str, None] = '7a95ce5a356d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('files', sa.Column('processing_stage', sa.String(length=32), nullable=True))
+    op.add_column('files', sa.Column('processing_progress', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('files', sa.Column('task_id', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_files_task_id'), 'files', ['task_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_files_task_id'), table_name='files')
+    op.drop_column('files', 'task_id')
+    op.drop_column('files', 'processing_progress')
+    op.drop_column('files', 'processing_stage')
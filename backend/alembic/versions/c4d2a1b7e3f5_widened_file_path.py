@@ -0,0 +1,34 @@
+"""widened file path for content addressed uploads
+
+Revision ID: c4d2a1b7e3f5
+Revises: b3c1f0e9a2d4
+Create Date: 2026-10-18 11:02:47.618230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d2a1b7e3f5'
+down_revision: Union[str, None] = 'b3c1f0e9a2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('files', 'file_path',
+               existing_type=sa.String(length=64),
+               type_=sa.String(length=255),
+               existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('files', 'file_path',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=64),
+               existing_nullable=False)
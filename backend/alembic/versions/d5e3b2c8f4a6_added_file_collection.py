@@ -0,0 +1,32 @@
+"""added file collection
+
+Revision ID: d5e3b2c8f4a6
+Revises: c4d2a1b7e3f5
+Create Date: 2026-10-18 15:21:09.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e3b2c8f4a6'
+down_revision: Union[str, None] = 'c4d2a1b7e3f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('files', sa.Column('collection_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_files_collection_id'), 'files', ['collection_id'], unique=False)
+    op.create_foreign_key('files_collection_id_fkey', 'files', 'collections', ['collection_id'], ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('files_collection_id_fkey', 'files', type_='foreignkey')
+    op.drop_index(op.f('ix_files_collection_id'), table_name='files')
+    op.drop_column('files', 'collection_id')
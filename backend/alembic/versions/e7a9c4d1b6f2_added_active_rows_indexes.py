@@ -0,0 +1,44 @@
+"""added active rows indexes
+
+Revision ID: e7a9c4d1b6f2
+Revises: d5e3b2c8f4a6
+Create Date: 2026-10-18 15:48:32.517094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a9c4d1b6f2'
+down_revision: Union[str, None] = 'd5e3b2c8f4a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('notes', 'quizzes', 'categories', 'collections', 'quiz_questions')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently on Postgres so large tables stay writable, which
+    # cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(
+                f'ix_{table}_creator_id_active',
+                table,
+                ['creator_id', sa.text('id DESC')],
+                unique=False,
+                postgresql_where=sa.text('is_deleted = false'),
+                sqlite_where=sa.text('is_deleted = false'),
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.drop_index(f'ix_{table}_creator_id_active', table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,70 @@
+"""added note search
+
+Revision ID: f3b8d2a6c9e1
+Revises: e7a9c4d1b6f2
+Create Date: 2026-10-18 17:12:05.204318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d2a6c9e1'
+down_revision: Union[str, None] = 'e7a9c4d1b6f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_context().dialect.name == 'postgresql':
+        # Adding a stored generated column rewrites the notes table.
+        op.execute(f"ALTER TABLE notes ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED")
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'ix_notes_search_vector',
+                'notes',
+                [sa.text('search_vector')],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+            )
+    elif op.get_context().dialect.name == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5("
+            "title, content, content='notes', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER notes_fts_insert AFTER INSERT ON notes BEGIN "
+            "INSERT INTO notes_fts (rowid, title, content) VALUES (new.id, new.title, new.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER notes_fts_delete AFTER DELETE ON notes BEGIN "
+            "INSERT INTO notes_fts (notes_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER notes_fts_update AFTER UPDATE OF title, content ON notes BEGIN "
+            "INSERT INTO notes_fts (notes_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); "
+            "INSERT INTO notes_fts (rowid, title, content) VALUES (new.id, new.title, new.content); END"
+        )
+        op.execute("INSERT INTO notes_fts (notes_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_notes_search_vector', table_name='notes', postgresql_concurrently=True)
+        op.drop_column('notes', 'search_vector')
+    elif op.get_context().dialect.name == 'sqlite':
+        for trigger in ('notes_fts_insert', 'notes_fts_delete', 'notes_fts_update'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS notes_fts")
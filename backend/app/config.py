@@ -1,5 +1,5 @@
 import os
-from typing import ClassVar
+from typing import ClassVar, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
 
@@ -16,6 +16,38 @@ class Config(BaseSettings):
     CELERY_BROKER_URL: str
     CELERY_RESULT_BACKEND: str
     SQLALCHEMY_DATABASE_URI: str
+    # Driver URL for the async engine, derived from SQLALCHEMY_DATABASE_URI when unset
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[str] = None
+
+    # Connection pool of each engine (sync and async)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Seconds before a pooled connection is replaced, -1 keeps them forever
+    DB_POOL_RECYCLE: int = 1800
+    # Seconds a checkout waits for a free connection before failing
+    DB_POOL_TIMEOUT: float = 30
+    # Test every connection on checkout. Costs a round-trip per checkout;
+    # with DB_POOL_RECYCLE below the server's idle timeout it can be disabled.
+    DB_POOL_PRE_PING: bool = True
+    # Server-side prepared statements cached per asyncpg connection, 0 disables
+    # them (required behind PgBouncer in transaction mode)
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    # Checkouts waiting longer than this many milliseconds are logged
+    DB_POOL_SLOW_CHECKOUT_MS: float = 100
+
+    # Seconds an authenticated user's snapshot is served from cache
+    USER_CACHE_TTL: int = 60
+    # Snapshots kept in each process's LRU
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    # Redis URL for a cache tier shared by all workers, unset keeps it per process
+    USER_CACHE_REDIS_URL: Optional[str] = None
+
+    # bcrypt cost factor for new hashes; older hashes are upgraded on sign-in
+    BCRYPT_ROUNDS: int = 12
+    # Threads dedicated to password hashing
+    PASSWORD_HASH_WORKERS: int = 4
+    # Hashing jobs allowed to queue before sign-ins are rejected with a 503
+    PASSWORD_HASH_QUEUE_LIMIT: int = 64
 
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=True, extra="allow"
@@ -1,2 +1,4 @@
 from .authorizations import get_current_user
-from .db import get_db, get_db_session
+from .db import get_async_db, get_async_db_session, get_db, get_db_session
+
+__all__ = ["get_current_user", "get_async_db", "get_async_db_session", "get_db", "get_db_session"]
@@ -1,28 +1,102 @@
 from typing import AsyncGenerator, Generator
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import asynccontextmanager, contextmanager
 from app.config import config
+from .pool_metrics import TimedAsyncQueuePool, TimedCheckoutMixin, TimedQueuePool
 
 DATABASE_URL = config.SQLALCHEMY_DATABASE_URI
 
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def to_async_url(url: str) -> str:
+    """Swap the driver of a sync database URL for its asyncio counterpart."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend, parsed.get_driver_name())
+    return parsed.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = config.SQLALCHEMY_ASYNC_DATABASE_URI or to_async_url(DATABASE_URL)
+
+
+def is_server_database(url: str) -> bool:
+    return make_url(url).get_backend_name() != "sqlite"
+
+
+def pool_options(url: str, poolclass: type) -> dict:
+    options = {
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+    }
+    # SQLite connections are file handles, not a server-side pool worth sizing,
+    # so SQLAlchemy's default pool for it is kept.
+    if is_server_database(url):
+        options.update(
+            poolclass=poolclass,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+        )
+    return options
+
+
+def with_statement_cache(url: str) -> str:
+    """Apply DB_PREPARED_STATEMENT_CACHE_SIZE to asyncpg URLs."""
+    parsed = make_url(url)
+    if parsed.get_driver_name() != "asyncpg" or "prepared_statement_cache_size" in parsed.query:
+        return url
+    return parsed.update_query_dict(
+        {"prepared_statement_cache_size": str(config.DB_PREPARED_STATEMENT_CACHE_SIZE)}
+    ).render_as_string(hide_password=False)
+
+
 engine = create_engine(
     DATABASE_URL,
-    pool_pre_ping=True,
+    **pool_options(DATABASE_URL, TimedQueuePool),
+)
+
+async_engine = create_async_engine(
+    with_statement_cache(ASYNC_DATABASE_URL),
+    **pool_options(ASYNC_DATABASE_URL, TimedAsyncQueuePool),
 )
 
+
+def engine_pool_stats(pool) -> dict:
+    if not isinstance(pool, TimedCheckoutMixin):
+        # SQLite keeps SQLAlchemy's default pool, which is not instrumented.
+        return {"pool": type(pool).__name__}
+    return pool.metrics.stats(pool, config.DB_MAX_OVERFLOW)
+
+
+def pool_stats() -> dict:
+    """Utilization and checkout wait times of both connection pools."""
+    return {
+        "sync": engine_pool_stats(engine.pool),
+        "async": engine_pool_stats(async_engine.pool),
+    }
+
 SessionLocal = sessionmaker(
     bind=engine,
     expire_on_commit=False,
     autoflush=False,
 )
 
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
 def get_db() -> Generator[Session, None]:
     with SessionLocal() as session:
         try:
             yield session
             session.commit()
-        except Exception as exc:
+        except Exception:
             session.rollback()
             raise
         finally:
@@ -35,8 +109,33 @@ def get_db_session() -> Generator[Session, None]:
         try:
             yield session
             session.commit()
-        except Exception as exc:
+        except Exception:
             session.rollback()
             raise
         finally:
             session.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+
+@asynccontextmanager
+async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
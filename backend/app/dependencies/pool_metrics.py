@@ -0,0 +1,81 @@
+"""
+Connection pool instrumentation.
+
+Engines on server databases use the pool subclasses below, which time how
+long every checkout waits for a connection. Together with the pool's own counters this
+gives the utilization reported on `/health`, and checkouts slower than
+`DB_POOL_SLOW_CHECKOUT_MS` are logged as they happen.
+"""
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.config import config
+from app.utils import logger
+
+
+class PoolMetrics:
+    def __init__(self, name: str, slow_checkout_ms: float = config.DB_POOL_SLOW_CHECKOUT_MS):
+        self.name = name
+        self.slow_checkout_ms = slow_checkout_ms
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+        if timed_out or seconds * 1000 >= self.slow_checkout_ms:
+            logger.warning(
+                f"{self.name} pool checkout waited {seconds * 1000:.0f} ms"
+                f"{' and timed out' if timed_out else ''}"
+            )
+
+    def stats(self, pool: QueuePool, max_overflow: int) -> dict:
+        """Utilization of `pool`, created with the given configured `max_overflow`."""
+        capacity = pool.size() + max(max_overflow, 0)
+        checked_out = pool.checkedout()
+        return {
+            "size": pool.size(),
+            "max_overflow": max_overflow,
+            "checked_out": checked_out,
+            "idle": pool.checkedin(),
+            "utilization": checked_out / capacity if capacity else 0.0,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": 1000 * self.total_wait / self.checkouts if self.checkouts else 0.0,
+            "max_wait_ms": 1000 * self.max_wait,
+        }
+
+
+class TimedCheckoutMixin:
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
+class TimedQueuePool(TimedCheckoutMixin, QueuePool):
+    """`QueuePool` of the sync engine, timing every checkout."""
+
+    metrics = PoolMetrics("sync")
+
+
+class TimedAsyncQueuePool(TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    """`AsyncAdaptedQueuePool` of the async engine, timing every checkout."""
+
+    metrics = PoolMetrics("async")
@@ -1,16 +1,57 @@
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 from app.config import config
 from app.routers import router as api_router
+from app.dependencies.db import pool_stats
+from app.utils.clients import registry as ai_clients
+from app.utils.response_cache import response_cache
+from app.utils.search_cache import search_cache
+from app.utils.concurrency import generation_limiter
+from app.utils.user_cache import user_cache
+from app.utils.password_pool import password_pool
+from app.utils.vars import AI_WARM_ON_STARTUP
 
 
 app_name = config.APP_NAME
 app_version = config.APP_VERSION
-app = FastAPI(title=app_name, version=app_version)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if AI_WARM_ON_STARTUP:
+        # In the background, so the CRUD routes serve while the clients build.
+        threading.Thread(
+            target=ai_clients.readiness, kwargs={"warm": True}, name="ai-warmup", daemon=True
+        ).start()
+    yield
+
+
+app = FastAPI(title=app_name, version=app_version, lifespan=lifespan)
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    """
+    Liveness plus the readiness of each AI backend. Backends are built
+    lazily, so they report `not_initialized` until first used, unless
+    AI_WARM_ON_STARTUP builds them when the process starts.
+    """
+    backends = ai_clients.readiness()
+    caches = {
+        "responses": response_cache.stats(),
+        "search": search_cache.stats(),
+        "users": user_cache.stats(),
+    }
+    return {
+        "status": "healthy",
+        "backends": backends,
+        "caches": caches,
+        "generation": generation_limiter.stats(),
+        "password_hashing": password_pool.stats(),
+        "database": pool_stats(),
+    }
 
 
 app.include_router(api_router, prefix="/api")
@@ -98,10 +98,16 @@ class File(BaseDBModel):
     id = sa.Column(sa.Integer, primary_key=True)
     name = sa.Column(sa.String(64), nullable=False, index=True)
     user_id = sa.Column(sa.Integer, sa.ForeignKey("users.id"), nullable=False)
-    file_path = sa.Column(sa.String(64), nullable=False)
+    file_path = sa.Column(sa.String(255), nullable=False)
     mimetype = sa.Column(sa.String(128), nullable=False)
     sha256 = sa.Column(sa.String(128), index=True, nullable=True)
     is_processed = sa.Column(sa.Boolean, default=False)
+    processing_stage = sa.Column(sa.String(32), nullable=True)
+    processing_progress = sa.Column(sa.Integer, nullable=False, default=0)
+    task_id = sa.Column(sa.String(64), index=True, nullable=True)
+    collection_id = sa.Column(
+        sa.Integer, sa.ForeignKey("collections.id"), nullable=True, index=True
+    )
     uploaded_by = sa.Column(
         sa.Integer, sa.ForeignKey("users.id"), nullable=False)
 
@@ -268,3 +274,48 @@ class FlashCard(BaseDBModel):
         now = datetime.now(timezone.utc)
         self.last_reviewed = now
         self.next_review_due = now + timedelta(days=self.interval_days)
+
+
+# Lists filter on the owner and skip soft-deleted rows, newest first. Partial
+# indexes over the live rows keep those pages O(limit) however much a user
+# has deleted.
+for _model in (Note, Quiz, Category, Collection, QuizQuestion):
+    sa.Index(
+        f"ix_{_model.__tablename__}_creator_id_active",
+        _model.creator_id,
+        _model.id.desc(),
+        postgresql_where=_model.is_deleted == sa.false(),
+        sqlite_where=_model.is_deleted == sa.false(),
+    )
+
+
+# Full-text search over notes. Postgres keeps a weighted tsvector generated
+# from the title and content, with a GIN index; SQLite mirrors the notes into
+# an FTS5 table kept in sync by triggers. Neither is mapped: migrations own the
+# Postgres column, these hooks cover databases made by `create_all`.
+NOTE_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'B')"
+)
+
+for _statement in (
+    f"ALTER TABLE notes ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({NOTE_SEARCH_VECTOR}) STORED",
+    "CREATE INDEX ix_notes_search_vector ON notes USING gin (search_vector)",
+):
+    sa.event.listen(Note.__table__, "after_create", sa.DDL(_statement).execute_if(dialect="postgresql"))
+
+# The migration chain does not run on SQLite, so `create_all` is what builds
+# the FTS5 fallback searched by `AsyncNoteService.search`.
+for _statement in (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5("
+    "title, content, content='notes', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER notes_fts_insert AFTER INSERT ON notes BEGIN "
+    "INSERT INTO notes_fts (rowid, title, content) VALUES (new.id, new.title, new.content); END",
+    "CREATE TRIGGER notes_fts_delete AFTER DELETE ON notes BEGIN "
+    "INSERT INTO notes_fts (notes_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); END",
+    "CREATE TRIGGER notes_fts_update AFTER UPDATE OF title, content ON notes BEGIN "
+    "INSERT INTO notes_fts (notes_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); "
+    "INSERT INTO notes_fts (rowid, title, content) VALUES (new.id, new.title, new.content); END",
+):
+    sa.event.listen(Note.__table__, "after_create", sa.DDL(_statement).execute_if(dialect="sqlite"))
+sa.event.listen(Note.__table__, "before_drop", sa.DDL("DROP TABLE IF EXISTS notes_fts").execute_if(dialect="sqlite"))
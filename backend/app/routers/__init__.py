@@ -5,6 +5,7 @@ from .categories import router as categories_router
 from .notes import router as notes_router
 from .collections import router as collections_router
 from .quizzes import router as quizzes_router
+from .documents import router as documents_router
 
 router = APIRouter()
 
@@ -14,3 +15,4 @@ router.include_router(categories_router, prefix="/categories", tags=["Category A
 router.include_router(notes_router, prefix="/notes", tags=["Notes APIs"])
 router.include_router(collections_router, prefix="/collections", tags=["Collections APIs"])
 router.include_router(quizzes_router, prefix="/quizzes", tags=["Quiz APIs"])
+router.include_router(documents_router, prefix="/documents", tags=["Document APIs"])
@@ -1,24 +1,26 @@
 from datetime import timedelta
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.models import User
 from app.schemas.request import SignUpRequest, SignInRequest
 from app.dependencies.db import get_db
 from app.schemas.response.base import BaseResponse
 from app.services import UserService
-from app.utils import JWTManager
+from app.utils import JWTManager, PasswordManager
+from app.utils.password_pool import password_pool
 
 router = APIRouter()
 
 @router.post("/signup", response_model=BaseResponse[None], status_code=status.HTTP_201_CREATED)
-def signup(
+async def signup(
     request: SignUpRequest,
     user_service: Annotated[UserService, Depends()],
     db: Annotated[Session, Depends(get_db)]
 ):
     try:
-        existing_user = user_service.get_one({'email': request.email})
+        existing_user = await run_in_threadpool(user_service.get_one, {'email': request.email})
         
         if existing_user:
             raise HTTPException(
@@ -26,14 +28,18 @@ def signup(
                 detail="Email already registered",
             )
         
-        existing_user = user_service.get_one({'username': request.username})
+        existing_user = await run_in_threadpool(user_service.get_one, {'username': request.username})
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already taken",
             )
+        # Hand the connection back to the pool while bcrypt runs.
+        await run_in_threadpool(db.close)
+        user_data = request.model_dump(exclude={'password'})
+        user_data['password_hash'] = await password_pool.hash_password(request.password)
         try:
-            new_user = user_service.create(request.model_dump())
+            new_user = await run_in_threadpool(user_service.create, user_data)
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -55,13 +61,13 @@ def signup(
 
 
 @router.post("/signin", response_model=BaseResponse[dict], status_code=status.HTTP_200_OK)
-def signin(
+async def signin(
     request: SignInRequest,
     user_service: Annotated[UserService, Depends()],
     db: Annotated[Session, Depends(get_db)]
 ):
     try:
-        user = user_service.get_one({'email': request.email})
+        user = await run_in_threadpool(user_service.get_one, {'email': request.email})
         
         if not user:
             raise HTTPException(
@@ -69,11 +75,18 @@ def signin(
                 detail="Invalid credentials",
             )
         
-        if not user.verify_password(request.password):
+        # Hand the connection back to the pool while bcrypt runs.
+        await run_in_threadpool(db.close)
+        if not await password_pool.verify_password(request.password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials",
             )
+
+        # Upgrade hashes made with a different cost while the password is at hand.
+        if PasswordManager.needs_rehash(user.password_hash):
+            password_hash = await password_pool.hash_password(request.password)
+            await run_in_threadpool(user_service.update, user.id, {'password_hash': password_hash})
         access_token = JWTManager.encode_data({'sub': str(user.id), 'type': 'access'}, timedelta(minutes=10))
         ref_exp = timedelta(days=7) if request.remember_me else timedelta(hours=3)
         refresh_token = JWTManager.encode_data({'sub': str(user.id), 'type': 'refresh'}, ref_exp)
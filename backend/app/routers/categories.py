@@ -1,11 +1,13 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from app.dependencies import get_current_user
 from app.models import User
 from app.schemas.request.notes import CreateCategory
 from app.schemas.response.base import BaseResponse, ListResponse
 from app.schemas.response.notes import CategoryResponse
-from app.services import CategoryService
+from app.services import AsyncCategoryService, CategoryService
+from app.utils.category_index import category_index
+from app.utils.pagination import decode_cursor
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies.db import get_db
 
@@ -29,6 +31,7 @@ def create_category(
         creation_data = request.model_dump()
         creation_data['creator_id'] = user.id
         category_service.create(creation_data)
+        category_index.invalidate(user.id)
         
         return BaseResponse[None](
             status_code=status.HTTP_201_CREATED,
@@ -43,17 +46,23 @@ def create_category(
 
 
 @router.get("/list", response_model=ListResponse[CategoryResponse], status_code=status.HTTP_200_OK)
-def list_categories(
+async def list_categories(
     user: Annotated[User, Depends(get_current_user)],
-    category_service: Annotated[CategoryService, Depends()],
+    category_service: Annotated[AsyncCategoryService, Depends()],
+    cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 100,
 ) -> ListResponse[CategoryResponse]:
+    before_id = decode_cursor(cursor)
     try:
-        categories = category_service.list({'creator_id': user.id})
+        categories, next_cursor = await category_service.page(
+            {'creator_id': user.id}, limit=limit, before_id=before_id
+        )
         return ListResponse[CategoryResponse](
             status_code=status.HTTP_200_OK,
             success=True,
             message="Categories retrieved successfully",
             data=categories,
+            next_cursor=next_cursor,
         )
     except Exception as e:
         raise HTTPException(
@@ -76,6 +85,7 @@ def delete_category(
                 detail="Category not found",
             )
         category_service.delete(category_id)
+        category_index.invalidate(user.id)
         return BaseResponse[None](
             status_code=status.HTTP_200_OK,
             success=True,
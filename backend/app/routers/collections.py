@@ -1,5 +1,5 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func, select
 
@@ -8,7 +8,8 @@ from app.models import Category, User, category_note_association_table
 from app.schemas.response.base import BaseResponse, ListResponse
 from app.schemas.response.notes import CollectionResponse
 from app.schemas.request.notes import CreateCollection
-from app.services import CollectionService
+from app.services import AsyncCollectionService, CollectionService
+from app.utils.pagination import decode_cursor
 
 router = APIRouter()
 
@@ -44,17 +45,23 @@ def create_collection(
         )
 
 @router.get("/list", response_model=ListResponse[CollectionResponse], status_code=status.HTTP_200_OK)
-def list_collections(
+async def list_collections(
     user: Annotated[User, Depends(get_current_user)],
-    collection_service: Annotated[CollectionService, Depends()],
+    collection_service: Annotated[AsyncCollectionService, Depends()],
+    cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 100,
 ) -> ListResponse[CollectionResponse]:
+    before_id = decode_cursor(cursor)
     try:
-        collections = collection_service.list({'creator_id': user.id})
+        collections, next_cursor = await collection_service.page(
+            {'creator_id': user.id}, limit=limit, before_id=before_id
+        )
         return ListResponse[CollectionResponse](
             status_code=status.HTTP_200_OK,
             success=True,
             message="Collections retrieved successfully",
             data=collections,
+            next_cursor=next_cursor,
         )
     except Exception as e:
         return BaseResponse[None](
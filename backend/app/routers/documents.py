@@ -1,21 +1,196 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, status
+from pathlib import Path
+from typing import Annotated, List, Optional, Tuple
+from uuid import uuid4
+from fastapi import APIRouter, Depends, HTTPException, status, File, Form, UploadFile
+from fastapi.concurrency import run_in_threadpool
+
 from app.dependencies import get_current_user
-from app.models import User
+from app.models import File as FileModel, User
 from app.schemas.response import BaseResponse
+from app.schemas.response.documents import FileStatusResponse, IngestionJobResponse
+from app.services import CollectionService, FileService
+from app.utils import aupload_file
 
 router = APIRouter()
 
-@router.get("/profile", response_model=BaseResponse[dict], status_code=status.HTTP_200_OK)
-def get_profile(
+
+def ensure_collection(collection_id: Optional[int], user: User, file_service: FileService) -> None:
+    """Raise unless `collection_id` is unset or one of the user's collections."""
+    if collection_id is None:
+        return
+    collection = CollectionService(file_service.session).get_one(
+        {"id": collection_id, "creator_id": user.id}
+    )
+    if collection is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Collection {collection_id} not found",
+        )
+
+
+def register_ingestion(
+    uploads: List[Tuple[UploadFile, Path, str]],
+    user: User,
+    file_service: FileService,
+    collection_id: Optional[int] = None,
+) -> dict:
+    """
+    Register saved `(upload, path, sha256)` files as `File` rows and hand
+    them to the ingestion worker. Files whose content was ingested before
+    are marked done straight away and reuse the existing chunks. Returns the
+    job id and the ids of the registered files.
+    """
+    job_id = str(uuid4())
+    file_ids, pending_ids = [], []
+    for file, uploaded_file_path, sha256 in uploads:
+        db_file = file_service.register_upload(
+            uploaded_file_path, file.filename, file.content_type, user.id,
+            sha256=sha256, task_id=job_id, collection_id=collection_id,
+        )
+        file_ids.append(db_file.id)
+        if file_service.get_ingested_by_sha256(sha256) is not None:
+            file_service.set_progress(db_file.id, "done", 100)
+        else:
+            pending_ids.append(db_file.id)
+
+    # The worker reads these rows from its own session, so they must be visible first.
+    file_service.session.commit()
+    if pending_ids:
+        from app.tasks.tasks import ingest_files
+
+        ingest_files.apply_async(args=[pending_ids], task_id=job_id)
+    return {"job_id": job_id, "file_ids": file_ids}
+
+
+async def queue_ingestion(
+    files: List[UploadFile],
+    user: User,
+    file_service: FileService,
+    collection_id: Optional[int] = None,
+) -> dict:
+    """
+    Save the uploads without blocking the event loop, then register them
+    and queue their ingestion. The database and broker calls run in the
+    threadpool.
+    """
+    await run_in_threadpool(ensure_collection, collection_id, user, file_service)
+    uploads = [(file, *await aupload_file(file)) for file in files]
+    return await run_in_threadpool(register_ingestion, uploads, user, file_service, collection_id)
+
+
+def ensure_files_processed(file_ids: List[int], user: User, file_service: FileService) -> List[FileModel]:
+    """Return the user's files, raising unless every one has been ingested."""
+    files = []
+    for file_id in set(file_ids):
+        db_file = file_service.get_one({"id": file_id, "user_id": user.id})
+        if db_file is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"File {file_id} not found",
+            )
+        if not db_file.is_processed:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"File {file_id} is still being processed ({db_file.processing_stage})",
+            )
+        files.append(db_file)
+    return files
+
+
+def resolve_sources(
+    file_ids: List[int],
+    collection_id: Optional[int],
+    user: User,
+    file_service: FileService,
+) -> List[str]:
+    """
+    Content hashes of the documents retrieval is scoped to: the attached
+    files, else the files in the collection, else all of the user's
+    ingested files. Chunks are filtered on these, so a request never sees
+    another user's documents.
+    """
+    if file_ids:
+        db_files = ensure_files_processed(file_ids, user, file_service)
+        return sorted({f.sha256 for f in db_files if f.sha256})
+    return file_service.list_ingested_sha256(user.id, collection_id)
+
+
+@router.post("/upload", response_model=BaseResponse[dict], status_code=status.HTTP_202_ACCEPTED)
+async def upload_documents(
     user: Annotated[User, Depends(get_current_user)],
+    file_service: Annotated[FileService, Depends()],
+    files: List[UploadFile] = File(...),
+    collection_id: Optional[int] = Form(None),
 ) -> BaseResponse[dict]:
     """
-    Get the profile of the current user.
+    Upload documents, optionally into one of the user's collections, and
+    queue them for background ingestion. Poll `/jobs/{job_id}` for progress.
     """
+    job = await queue_ingestion(files, user, file_service, collection_id)
     return BaseResponse[dict](
+        status_code=status.HTTP_202_ACCEPTED,
+        success=True,
+        message="Files queued for ingestion",
+        data=job,
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=BaseResponse[IngestionJobResponse], status_code=status.HTTP_200_OK)
+def get_ingestion_job(
+    job_id: str,
+    user: Annotated[User, Depends(get_current_user)],
+    file_service: Annotated[FileService, Depends()],
+) -> BaseResponse[IngestionJobResponse]:
+    """
+    Get the state of an ingestion job and the progress of each of its files.
+    """
+    files = file_service.list({"task_id": job_id, "user_id": user.id})
+    if not files:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+
+    if all(file.is_processed for file in files):
+        # Jobs made only of duplicate uploads never reach the worker.
+        state = "SUCCESS"
+    else:
+        from celery.result import AsyncResult
+        from app.tasks.worker import celery
+
+        state = AsyncResult(job_id, app=celery).state
+    progress = sum(file.processing_progress or 0 for file in files) // len(files)
+    return BaseResponse[IngestionJobResponse](
+        status_code=status.HTTP_200_OK,
+        success=True,
+        message="Job retrieved successfully",
+        data=IngestionJobResponse(
+            job_id=job_id,
+            state=state,
+            progress=progress,
+            files=[FileStatusResponse.model_validate(file) for file in files],
+        ),
+    )
+
+
+@router.get("/{file_id}/status", response_model=BaseResponse[FileStatusResponse], status_code=status.HTTP_200_OK)
+def get_file_status(
+    file_id: int,
+    user: Annotated[User, Depends(get_current_user)],
+    file_service: Annotated[FileService, Depends()],
+) -> BaseResponse[FileStatusResponse]:
+    """
+    Get the ingestion status of a single uploaded file.
+    """
+    db_file = file_service.get_one({"id": file_id, "user_id": user.id})
+    if db_file is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found",
+        )
+    return BaseResponse[FileStatusResponse](
         status_code=status.HTTP_200_OK,
         success=True,
-        message="Profile retrieved successfully",
-        data=user.to_dict(),
+        message="File status retrieved successfully",
+        data=db_file,
     )
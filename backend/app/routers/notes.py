@@ -1,19 +1,23 @@
-import os
-from typing import Annotated, List
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
-from sqlalchemy import select
-from pathlib import Path
+import json
+from typing import Annotated, Any, AsyncIterator, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, File, UploadFile, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_current_user, get_db
+from app.dependencies import get_current_user, get_db, get_db_session
 from app.models import Category, User, category_note_association_table
 from app.schemas.response.base import BaseResponse, ListResponse
-from app.schemas.response.notes import CategoryResponse, NoteResponse
+from app.schemas.response.notes import CategoryResponse, NoteResponse, NoteSearchResult, NoteSummaryResponse
 from app.schemas.request.notes import CreateNote
-from app.services import CategoryService, NoteService
-from app.utils.create_note_and_quiz_ai import create_note as create_notes_ai
-from app.utils import logger, upload_file 
+from app.services import AsyncNoteService, CategoryService, FileService, NoteService
+from app.routers.documents import queue_ingestion, resolve_sources
+from app.utils import logger
+from app.utils.category_index import category_index
+from app.utils.concurrency import generation_limiter
+from app.utils.pagination import decode_cursor, decode_rank_cursor
 
 router = APIRouter()
 
@@ -48,12 +52,7 @@ def create_note(
                 if len(categories) != count:
                     raise ValueError("Some categories do not exist.")
 
-            for category in categories:
-                query = category_note_association_table.insert().values(
-                    category_id=category,
-                    note_id=created_note.id,
-                )
-                db.execute(query)
+            note_service.add_categories(created_note.id, list(categories))
 
         return BaseResponse[NoteResponse](
             status_code=status.HTTP_201_CREATED,
@@ -70,36 +69,142 @@ def create_note(
 
 
 @router.get("/list", response_model=ListResponse[NoteResponse], status_code=status.HTTP_200_OK)
-def list_notes(
+async def list_notes(
     user: Annotated[User, Depends(get_current_user)],
-    note_service: Annotated[NoteService, Depends()],
+    note_service: Annotated[AsyncNoteService, Depends()],
+    cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 100,
 ) -> ListResponse[NoteResponse]:
     """
-    Get the list of notes for the current user.
+    Get the list of notes for the current user, newest first. Pass the
+    returned `next_cursor` as `cursor` to get the next page.
     """
-    # Assuming you have a method to get notes for the user
-    notes = note_service.list(filters={'creator_id': user.id})
-    # notes = note_service.list()
+    notes, next_cursor = await note_service.page(
+        {'creator_id': user.id}, limit=limit, before_id=decode_cursor(cursor), load=('categories',)
+    )
     return ListResponse[NoteResponse](
         status_code=status.HTTP_200_OK,
         success=True,
         message="Notes retrieved successfully",
         data=notes,
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/list/summary", response_model=ListResponse[NoteSummaryResponse], status_code=status.HTTP_200_OK)
+async def list_note_summaries(
+    user: Annotated[User, Depends(get_current_user)],
+    note_service: Annotated[AsyncNoteService, Depends()],
+    cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 100,
+) -> ListResponse[NoteSummaryResponse]:
+    """
+    Like `/list`, but each note carries an excerpt instead of its full
+    content, which is never read from the database.
+    """
+    rows, next_cursor = await note_service.page(
+        {'creator_id': user.id}, limit=limit, before_id=decode_cursor(cursor), summary=True
+    )
+    categories = await note_service.categories_by_note([row.id for row in rows])
+    notes = [
+        NoteSummaryResponse(
+            **row._mapping,
+            categories=[CategoryResponse.model_validate(category) for category in categories[row.id]],
+        )
+        for row in rows
+    ]
+    return ListResponse[NoteSummaryResponse](
+        status_code=status.HTTP_200_OK,
+        success=True,
+        message="Notes retrieved successfully",
+        data=notes,
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/search", response_model=ListResponse[NoteSearchResult], status_code=status.HTTP_200_OK)
+async def search_notes(
+    user: Annotated[User, Depends(get_current_user)],
+    note_service: Annotated[AsyncNoteService, Depends()],
+    q: Annotated[str, Query(min_length=1, max_length=256)],
+    cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+) -> ListResponse[NoteSearchResult]:
+    """
+    Full-text search over the titles and content of the user's notes,
+    best matches first, with highlighted snippets.
+    """
+    rows, next_cursor = await note_service.search(user.id, q, limit=limit, after=decode_rank_cursor(cursor))
+    return ListResponse[NoteSearchResult](
+        status_code=status.HTTP_200_OK,
+        success=True,
+        message="Notes retrieved successfully",
+        data=[NoteSearchResult.model_validate(row) for row in rows],
+        next_cursor=next_cursor,
     )
 
 
+def save_ai_note(
+    generated_content: dict,
+    user: User,
+    note_service: NoteService,
+    category_service: CategoryService,
+) -> dict:
+    """
+    Persist a generated note together with its categories and return it
+    serialized as a `NoteResponse` dict.
+    """
+    title = generated_content.get("title", "AI Generated Note")
+    content = generated_content.get("note_content", "")
+    categories = generated_content.get("categories", {})
+
+    creation_data = {
+        "title": title,
+        "content": content,
+        "is_ai_generated": True,
+        "creator_id": user.id,
+    }
+    created_note = note_service.create(creation_data)
+    all_categories = []
+    # Matched categories already exist, get_or_ai_create only adds new ones.
+    for cat in categories.get('category', []):
+        db_category = category_service.get_or_ai_create(cat, user.id)
+        all_categories.append(CategoryResponse.model_validate(db_category).model_dump())
+    note_service.add_categories(created_note.id, [category['id'] for category in all_categories])
+    if categories.get('created') == True:  # noqa: E712
+        category_index.invalidate(user.id)
+    generated_note = NoteResponse.model_validate(created_note).model_dump()
+    generated_note['is_ai_generated'] = True
+    generated_note['categories'] = categories.get('category', [])
+    return generated_note
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
 @router.post("/create-ai-note", response_model=BaseResponse[dict], status_code=status.HTTP_201_CREATED)
-def create_ai_note(
+async def create_ai_note(
+    response: Response,
     user: Annotated[User, Depends(get_current_user)],
     note_service: Annotated[NoteService, Depends()],
     category_service: Annotated[CategoryService, Depends()],
-    db: Annotated[Session, Depends(get_db)],
+    file_service: Annotated[FileService, Depends()],
     user_prompt_input: str = Form(...),
     rag_enabled: bool = Form(False),
     files: List[UploadFile] = File([]),
+    file_ids: List[int] = Form([]),
+    collection_id: Optional[int] = Form(None),
 ) -> BaseResponse[dict]:
     """
-    Create a note using AI generation, with optional RAG if files are provided.
+    Create a note using AI generation, with optional RAG over the user's
+    ingested documents, narrowed to `file_ids` or a `collection_id`. Raw
+    `files` are queued for background ingestion and the job id is returned
+    instead of a note.
+
+    Generation runs on the event loop under `generation_limiter`; the
+    database work is handed to the threadpool.
     """
     print("INSIDE CREATE AI NOTE")
     print("USER PROMPT: ", user_prompt_input)
@@ -119,54 +224,41 @@ def create_ai_note(
     #         }
     #     }
     try:
-        saved_files = []
         if files:
-            rag_enabled = True
-            upload_dir = Path("uploads")
-            upload_dir.mkdir(exist_ok=True)
-
-            for file in files:
-                uploaded_file_path = upload_file(file)
-                print("UPLOADED FILE PATH: ", uploaded_file_path)
-                # file_path = os.path.join(upload_dir, file.filename)
-                # with open(file_path, "wb") as buffer:
-                #     buffer.write(file.read())
-                # saved_files.append(str(file_path))
-                from app.utils.data_ingestor import RAG
-                RAG().ingest_file(str(uploaded_file_path))
-
-        all_db_categories = category_service.list(filters={'creator_id': user.id, 'is_deleted': False})
+            job = await queue_ingestion(files, user, file_service, collection_id)
+            response.status_code = status.HTTP_202_ACCEPTED
+            return BaseResponse[dict](
+                status_code=status.HTTP_202_ACCEPTED,
+                success=True,
+                message="Files queued for ingestion. Retry with file_ids once the job is done.",
+                data=job,
+            )
+        sources = []
+        if rag_enabled or file_ids or collection_id is not None:
+            sources = await run_in_threadpool(resolve_sources, file_ids, collection_id, user, file_service)
+            # Without any documents of the user's own, fall back to web search.
+            rag_enabled = bool(sources)
+
+        # Loaded on demand so CRUD-only workers never import the AI stack.
+        from app.utils.create_note_and_quiz_ai import acreate_note
+
+        all_db_categories = await run_in_threadpool(
+            category_service.list, {'creator_id': user.id, 'is_deleted': False}
+        )
         all_category_names = [cat.name for cat in all_db_categories]
         
-        generated_content = create_notes_ai(
-            all_categories=all_category_names,
-            user_prompt=user_prompt_input,
-            rag_enabled=rag_enabled
-        )
+        async with generation_limiter.slot():
+            generated_content = await acreate_note(
+                all_categories=all_category_names,
+                user_prompt=user_prompt_input,
+                rag_enabled=rag_enabled,
+                user_id=user.id,
+                sources=sources,
+            )
 
-        title = generated_content.get("title", "AI Generated Note")
-        content = generated_content.get("note_content", "")
-        categories = generated_content.get("categories", {})
-        
-        creation_data = {
-            "title": title,
-            "content": content,
-            "is_ai_generated": True,
-            "creator_id": user.id,
-        }
-        created_note = note_service.create(creation_data)
-        all_categories = []
-        if categories.get('created') == True:  # noqa: E712
-            for cat in categories['category']:
-                db_category = category_service.get_or_ai_create(cat, user.id)
-                all_categories.append(CategoryResponse.model_validate(db_category).model_dump())
-                db.execute(
-                    category_note_association_table.insert()
-                    .values(category_id=db_category.id, note_id=created_note.id)
-                )
-        generated_note = NoteResponse.model_validate(created_note).model_dump()
-        generated_note['is_ai_generated'] = True
-        generated_note['categories'] = categories.get('category', [])
+        generated_note = await run_in_threadpool(
+            save_ai_note, generated_content, user, note_service, category_service
+        )
         print("GENERATED NOTE : ", generated_note)
         # Return the created note
         return BaseResponse[dict](
@@ -175,6 +267,8 @@ def create_ai_note(
             message="AI note created successfully",
             data=generated_note,
         )
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=402,
@@ -182,6 +276,68 @@ def create_ai_note(
         )
 
 
+@router.post("/create-ai-note/stream", status_code=status.HTTP_200_OK)
+async def stream_ai_note(
+    user: Annotated[User, Depends(get_current_user)],
+    category_service: Annotated[CategoryService, Depends()],
+    file_service: Annotated[FileService, Depends()],
+    user_prompt_input: str = Form(...),
+    rag_enabled: bool = Form(False),
+    file_ids: List[int] = Form([]),
+    collection_id: Optional[int] = Form(None),
+) -> StreamingResponse:
+    """
+    Create a note using AI generation and stream it over Server-Sent Events.
+
+    Emits `token` events as the note is written, then a single `done` event
+    carrying the saved note, or an `error` event if generation fails.
+    """
+    sources = []
+    if rag_enabled or file_ids or collection_id is not None:
+        sources = await run_in_threadpool(resolve_sources, file_ids, collection_id, user, file_service)
+        # Without any documents of the user's own, fall back to web search.
+        rag_enabled = bool(sources)
+
+    all_db_categories = await run_in_threadpool(
+        category_service.list, {'creator_id': user.id, 'is_deleted': False}
+    )
+    all_category_names = [cat.name for cat in all_db_categories]
+
+    from app.utils.create_note_and_quiz_ai import stream_note
+
+    def persist(generated_content: dict) -> dict:
+        # The request session is closed once streaming starts, use a fresh one.
+        with get_db_session() as session:
+            return save_ai_note(
+                generated_content, user, NoteService(session), CategoryService(session)
+            )
+
+    async def events() -> AsyncIterator[str]:
+        # The slot is taken inside the stream so a client that disconnects
+        # before the body starts can never leak it.
+        try:
+            async with generation_limiter.slot():
+                async for item in stream_note(
+                    all_category_names, user_prompt_input, rag_enabled, user.id, sources
+                ):
+                    if "token" in item:
+                        yield sse_event("token", item["token"])
+                    else:
+                        generated_note = await run_in_threadpool(persist, item)
+                        yield sse_event("done", generated_note)
+        except HTTPException as e:
+            yield sse_event("error", {"detail": e.detail})
+        except Exception as e:
+            logger.error(f"Error streaming AI note: {e}")
+            yield sse_event("error", {"detail": f"Error creating AI note: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{note_id}", response_model=BaseResponse[NoteResponse], status_code=status.HTTP_200_OK)
 def get_note(
     note_id: int,
@@ -192,7 +348,7 @@ def get_note(
     Get a specific note by ID.
     """
     try:
-        note = note_service.get_by_id(note_id)
+        note = note_service.get_by_id(note_id, load=('categories',))
         # note = note.to_dict()
         # note["categories"] = [CategoryResponse.model_validate(cat).model_dump() for cat in note["categories"]]
         print("NOTE CATEGORIES: ", note.to_dict())
@@ -267,12 +423,7 @@ def update_note(
                         category_note_association_table.c.note_id == note_id
                     )
                 )
-                for category in categories:
-                    query = category_note_association_table.insert().values(
-                        category_id=category,
-                        note_id=updated_note.id,
-                    )
-                    db.execute(query)
+                note_service.add_categories(updated_note.id, list(categories))
         return BaseResponse[None](
             status_code=status.HTTP_200_OK,
             success=True,
@@ -1,91 +1,109 @@
-import os
-from typing import Annotated, List
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
-from sqlalchemy import select
-from pathlib import Path
-from sqlalchemy import func, select, insert
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, File, UploadFile, Form
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.dependencies import get_current_user, get_db
-from app.models import Category, QuizQuestion, User, category_note_association_table
+from app.models import User
 from app.schemas.response.base import BaseResponse, ListResponse
-from app.schemas.response.notes import NoteResponse
-from app.schemas.request.notes import CreateNote
-from app.services import CategoryService, NoteService, QuizService
-from app.utils.create_note_and_quiz_ai import create_quiz as create_quiz_ai
-from app.utils import logger, upload_file
+from app.services import AsyncQuizService, FileService, QuizQuestionService, QuizService
+from app.routers.documents import queue_ingestion, resolve_sources
+from app.utils import logger
+from app.utils.concurrency import generation_limiter
+from app.utils.pagination import decode_cursor
 from app.schemas.response.quizzes import QuizResponse, QuizViewResponse
 
 router = APIRouter()
 
 
-@router.post("/create", response_model=BaseResponse[None])
-def create_quiz(
+def save_ai_quiz(
+    created_quiz: dict,
+    user: User,
+    quiz_service: QuizService,
+    quiz_question_service: QuizQuestionService,
+) -> None:
+    """Persist a generated quiz together with its questions."""
+    title = created_quiz.get("title", "AI Generated Quiz")
+    quiz_content = created_quiz.get("quiz_content", {})
+    questions = quiz_content.get("questions", [])
+    data = []
+
+    db_quiz = quiz_service.create(
+        {
+            "title": title,
+            "content": created_quiz.get("content", ""),
+            "is_ai_generated": True,
+            "creator_id": user.id,
+        }
+    )
+    for question in questions:
+        data.append(
+            {
+                "question_type": "mcq",
+                "question": question.get("question"),
+                "options": question.get("options", []),
+                "answer": question.get("answer", ""),
+                "quiz_id": db_quiz.id,
+                "creator_id": user.id,
+                'is_ai_generated': True
+            }
+        )
+
+    # `get_db` commits once the request is done.
+    quiz_question_service.bulk_create(data)
+
+
+@router.post("/create", response_model=BaseResponse[dict])
+async def create_quiz(
+    response: Response,
     quiz_service: Annotated[QuizService, Depends()],
+    quiz_question_service: Annotated[QuizQuestionService, Depends()],
+    file_service: Annotated[FileService, Depends()],
     files: list[UploadFile] = File([]),
+    file_ids: list[int] = Form([]),
+    collection_id: Optional[int] = Form(None),
     user_prompt_input: str = Form(...),
     rag_enabled: bool = Form(False),
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> BaseResponse[None]:
+) -> BaseResponse[dict]:
     """
-    Create a quiz from a file.
+    Create a quiz, with optional RAG over the user's ingested documents,
+    narrowed to `file_ids` or a `collection_id`. Raw `files` are queued for background ingestion and the job id is
+    returned instead of a quiz.
+
+    Generation runs on the event loop under `generation_limiter`; the
+    database work is handed to the threadpool.
     """
     try:
-        saved_files = []
         if files:
-            rag_enabled = True
-            upload_dir = Path("uploads")
-            upload_dir.mkdir(exist_ok=True)
-
-            for file in files:
-                uploaded_file_path = upload_file(file)
-                print("UPLOADED FILE PATH: ", uploaded_file_path)
-                # file_path = upload_dir / file.filename
-                # with open(file_path, "wb") as buffer:
-                #     buffer.write(file.read())
-                # saved_files.append(str(file_path))
-                from app.utils.data_ingestor import RAG
-                RAG().ingest_file(str(uploaded_file_path))
-
-        created_quiz = create_quiz_ai(
-            user_prompt_input=user_prompt_input,
-            rag_enabled=rag_enabled
-        )
-        logger.info("Quiz created successfully.")
-        title = created_quiz.get("title", "AI Generated Quiz")
-        quiz_content = created_quiz.get("quiz_content", {})
-        questions = quiz_content.get("questions", [])
-        data = []
-
-        db_quiz = quiz_service.create(
-            {
-                "title": title,
-                "content": created_quiz.get("content", ""),
-                "is_ai_generated": True,
-                "creator_id": user.id,
-            }
-        )
-        for question in questions:
-            data.append(
-                {
-                    "question_type": "mcq",
-                    "question": question.get("question"),
-                    "options": question.get("options", []),
-                    "answer": question.get("answer", ""),
-                    "quiz_id": db_quiz.id,
-                    "creator_id": user.id,
-                    'is_ai_generated': True
-                }
+            job = await queue_ingestion(files, user, file_service, collection_id)
+            response.status_code = status.HTTP_202_ACCEPTED
+            return BaseResponse[dict](
+                status_code=status.HTTP_202_ACCEPTED,
+                data=job,
+                message="Files queued for ingestion. Retry with file_ids once the job is done.",
             )
+        sources = []
+        if rag_enabled or file_ids or collection_id is not None:
+            sources = await run_in_threadpool(resolve_sources, file_ids, collection_id, user, file_service)
+            # Without any documents of the user's own, fall back to web search.
+            rag_enabled = bool(sources)
+
+        # Loaded on demand so CRUD-only workers never import the AI stack.
+        from app.utils.create_note_and_quiz_ai import acreate_quiz
 
-        for question_data in data:
-            db.execute(
-                insert(QuizQuestion).values(**question_data)
+        async with generation_limiter.slot():
+            created_quiz = await acreate_quiz(
+                user_prompt_input=user_prompt_input,
+                rag_enabled=rag_enabled,
+                sources=sources,
             )
-        db.commit()
+        logger.info("Quiz created successfully.")
+        await run_in_threadpool(save_ai_quiz, created_quiz, user, quiz_service, quiz_question_service)
 
         return BaseResponse(data=None, message="Quiz created successfully.")
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error creating quiz: {e}")
         raise HTTPException(
@@ -95,18 +113,21 @@ def create_quiz(
 
 
 @router.get("/list", response_model=ListResponse[QuizResponse])
-def list_quizzes(
-    quiz_service: Annotated[QuizService, Depends()],
+async def list_quizzes(
+    quiz_service: Annotated[AsyncQuizService, Depends()],
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 100,
 ) -> ListResponse[QuizResponse]:
     """
-    List all quizzes created by the user.
+    List the quizzes created by the user, newest first, one page at a time.
     """
+    before_id = decode_cursor(cursor)
     try:
-        quizzes = quiz_service.list({"creator_id": user.id})
+        quizzes, next_cursor = await quiz_service.page({"creator_id": user.id}, limit=limit, before_id=before_id)
         return ListResponse[QuizResponse](
-            data=quizzes
+            data=quizzes,
+            next_cursor=next_cursor,
         )
     except Exception as e:
         logger.error(f"Error retrieving quizzes: {e}")
@@ -127,7 +148,7 @@ def view_quiz(
     View a specific quiz by ID.
     """
     try:
-        quiz = quiz_service.get_one({"id": quiz_id, "creator_id": user.id})
+        quiz = quiz_service.get_one({"id": quiz_id, "creator_id": user.id}, load=("questions",))
         if not quiz:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -18,9 +18,11 @@ class BaseResponse(BaseModel, Generic[DataType]):
 
 class ListResponse(BaseResponse[DataType]):
     """
-    Base response model for list responses.
+    Base response model for list responses. `next_cursor` is passed back
+    as `cursor` to fetch the next page; it is None on the last page.
     """
     data: Optional[List[DataType]] = None
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class FileStatusResponse(BaseModel):
+    id: int
+    name: str
+    mimetype: str
+    is_processed: Optional[bool] = False
+    processing_stage: Optional[str] = None
+    processing_progress: Optional[int] = 0
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class IngestionJobResponse(BaseModel):
+    job_id: str
+    state: str
+    progress: int = 0
+    files: List[FileStatusResponse] = []
@@ -25,4 +25,40 @@ class NoteResponse(BaseModel):
     updated_at: Optional[datetime] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class NoteSummaryResponse(BaseModel):
+    """
+    A note without its body, for note-library listings. `excerpt` holds the
+    first characters of the content.
+    """
+    id: int
+    title: str
+    excerpt: str = ""
+    is_ai_generated: Optional[bool] = False
+    categories: Optional[List[CategoryResponse]] = []
+
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class NoteSearchResult(BaseModel):
+    """
+    A note matching a search. `snippet` is an excerpt with the matched
+    terms wrapped in <mark> tags; results are ordered by `rank`.
+    """
+    id: int
+    title: str
+    snippet: Optional[str] = None
+    rank: float
+    is_ai_generated: Optional[bool] = False
+
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
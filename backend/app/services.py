@@ -1,20 +1,132 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Annotated
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Annotated
 from fastapi import Depends
-from sqlalchemy import and_, select, update as sqlalchemy_update
-from sqlalchemy.orm import DeclarativeMeta, Session
+from sqlalchemy import and_, func, insert, literal_column, or_, select, table, true, update as sqlalchemy_update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import DeclarativeMeta, Session, raiseload, selectinload
 from sqlalchemy.sql import Select
 
-from app.dependencies.db import get_db
-from app.models import Category, Collection, Note, Quiz, QuizQuestion, User
+from app.dependencies.db import get_async_db, get_db
+from app.models import Category, Collection, File, Note, Quiz, QuizQuestion, User, category_note_association_table
+from app.utils.keyword_index import match_query
+from app.utils.pagination import encode_cursor, encode_rank_cursor
+from app.utils.user_cache import mark_stale
 
 ModelType = TypeVar("ModelType", bound=DeclarativeMeta)
 
 
-class BaseService(Generic[ModelType]):
-    def __init__(self, session: Session, model: Type[ModelType]):
+def loader_options(model: Type[ModelType], load: Sequence[str]) -> list:
+    """
+    Eagerly load only the relationships named in `load`, one level deep.
+    Every other relationship raises on access instead of running the
+    `selectin` cascade configured on the models.
+    """
+    options = [selectinload(getattr(model, name)).raiseload("*") for name in load]
+    options.append(raiseload("*"))
+    return options
+
+
+# Characters of `excerpt_column` returned by `list(summary=True)`.
+EXCERPT_LENGTH = 200
+
+
+def summary_columns(model: Type[ModelType], columns: Sequence[str], excerpt_column: Optional[str]) -> list:
+    """Columns of a summary projection, the excerpt cut by the database."""
+    selected = [getattr(model, name) for name in columns]
+    if excerpt_column is not None:
+        selected.append(func.substr(getattr(model, excerpt_column), 1, EXCERPT_LENGTH).label("excerpt"))
+    return selected
+
+
+class BaseQueries(Generic[ModelType]):
+    """
+    Statements shared by `BaseService` and `AsyncBaseService`. The services
+    only execute them, on a `Session` or an `AsyncSession`.
+    """
+    # Selected by `list(summary=True)` instead of whole rows.
+    summary_columns: Sequence[str] = ("id",)
+    excerpt_column: Optional[str] = None
+
+    def __init__(self, session, model: Type[ModelType]):
         self.session = session
         self.model = model
 
+    def filter_conditions(self, filters: Dict[str, Any]) -> list:
+        """Equality conditions for the known fields in `filters`, excluding soft‑deleted rows."""
+        conditions = [
+            getattr(self.model, field) == value
+            for field, value in filters.items()
+            if hasattr(self.model, field)
+        ]
+        conditions.append(self.model.is_deleted == False)  # noqa: E712
+        return conditions
+
+    def bulk_insert_query(self):
+        # Batched into multi-row VALUES statements. Ids come from an
+        # increasing sequence, so sorting them restores input order;
+        # `sort_by_parameter_order` would insert row by row on SQLite.
+        return insert(self.model).returning(self.model.id)
+
+    def get_by_id_query(self, id: Any, load: Sequence[str] = ()) -> Select:
+        return select(self.model).where(
+            self.model.id == id,
+            self.model.is_deleted == False,  # noqa: E712
+        ).options(*loader_options(self.model, load))
+
+    def get_one_query(self, filters: Dict[str, Any], load: Sequence[str] = ()) -> Select:
+        return select(self.model).where(and_(*self.filter_conditions(filters))).options(*loader_options(self.model, load))
+
+    def list_query(
+        self,
+        filters: Dict[str, Any],
+        skip: int = 0,
+        limit: int = 100,
+        before_id: Optional[int] = None,
+        load: Sequence[str] = (),
+        summary: bool = False,
+    ) -> Select:
+        conditions = self.filter_conditions(filters)
+        if before_id is not None:
+            conditions.append(self.model.id < before_id)
+        if summary:
+            query: Select = select(*summary_columns(self.model, self.summary_columns, self.excerpt_column))
+        else:
+            query = select(self.model).options(*loader_options(self.model, load))
+        return query.where(and_(*conditions)).order_by(self.model.id.desc()).offset(skip).limit(limit)
+
+    @staticmethod
+    def list_rows(result, summary: bool) -> list:
+        return result.all() if summary else result.scalars().all()
+
+    @staticmethod
+    def next_page(rows: list, limit: int) -> Tuple[list, Optional[str]]:
+        """Trim the extra row fetched by `page` and derive the next cursor from it."""
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].id)
+
+    def update_query(self, id: Any, obj_in: dict):
+        return (
+            sqlalchemy_update(self.model)
+            .where(self.model.id == id, self.model.is_deleted == False)  # noqa: E712
+            .values(**obj_in)
+            .execution_options(synchronize_session="fetch")
+        )
+
+    def delete_query(self, id: Any):
+        return (
+            sqlalchemy_update(self.model)
+            .where(self.model.id == id, self.model.is_deleted == False)  # noqa: E712
+            .values(is_deleted=True)  # type: ignore
+            .execution_options(synchronize_session="fetch")
+        )
+
+
+class BaseService(BaseQueries[ModelType]):
+    def __init__(self, session: Session, model: Type[ModelType]):
+        super().__init__(session, model)
+
     def create(self, obj_in: dict) -> ModelType:
         """Instantiate and persist a new model instance."""
         try:
@@ -26,59 +138,73 @@ class BaseService(Generic[ModelType]):
             print(f"Error creating {self.model.__name__}: {e}")
             raise e
 
-    def get_by_id(self, id: Any) -> Optional[ModelType]:
-        """Fetch a single record by primary key, if not soft‑deleted."""
-        query: Select = select(self.model).where(
-            self.model.id == id,
-            self.model.is_deleted == False,  # noqa: E712
-        )
-        result = self.session.execute(query)
+    def bulk_create(self, objs_in: List[dict]) -> List[int]:
+        """
+        Insert many records in one round-trip and return their ids in input
+        order. Rows are not loaded as instances; fetch them by id if needed.
+        """
+        if not objs_in:
+            return []
+        try:
+            result = self.session.execute(self.bulk_insert_query(), objs_in)
+            return sorted(result.scalars().all())
+        except Exception as e:
+            print(f"Error bulk creating {self.model.__name__}: {e}")
+            raise e
+
+    def get_by_id(self, id: Any, load: Sequence[str] = ()) -> Optional[ModelType]:
+        """
+        Fetch a single record by primary key, if not soft‑deleted, with
+        the relationships named in `load`.
+        """
+        result = self.session.execute(self.get_by_id_query(id, load))
         return result.scalar_one_or_none()
 
-    def get_one(self, filters: Dict[str, Any]) -> Optional[ModelType]:
+    def get_one(self, filters: Dict[str, Any], load: Sequence[str] = ()) -> Optional[ModelType]:
         """
         Fetch a single record matching the given filters,
         excluding any soft‑deleted rows (is_deleted == True).
         """
-        conditions = [
-            getattr(self.model, field) == value
-            for field, value in filters.items()
-            if hasattr(self.model, field)
-        ]
-        conditions.append(self.model.is_deleted == False)  # noqa: E712
-        query: Select = select(self.model).where(and_(*conditions))
-
-        result = self.session.execute(query)
+        result = self.session.execute(self.get_one_query(filters, load))
         return result.scalar_one_or_none()
 
     def list(
-        self, filters: Dict[str, Any], skip: int = 0, limit: int = 100
+        self,
+        filters: Dict[str, Any],
+        skip: int = 0,
+        limit: int = 100,
+        before_id: Optional[int] = None,
+        load: Sequence[str] = (),
+        summary: bool = False,
     ) -> List[ModelType]:
         """
-        List non‑deleted records matching the given filters,
-        with pagination via skip/limit.
+        List non‑deleted records matching the given filters, newest first.
+        Pass `before_id` to seek past the last row of the previous page
+        (keyset pagination) instead of skipping rows with `skip`. Only the
+        relationships named in `load` are loaded. With `summary`, rows
+        hold only `summary_columns` and an `excerpt` instead of entities.
         """
-        conditions = [
-            getattr(self.model, field) == value
-            for field, value in filters.items()
-            if hasattr(self.model, field)
-        ]
-        conditions.append(self.model.is_deleted == False)  # noqa: E712
-        combined = and_(*conditions)
-        query: Select = select(self.model).where(combined).order_by(self.model.id.desc()).offset(skip).limit(limit)
+        result = self.session.execute(self.list_query(filters, skip, limit, before_id, load, summary))
+        return self.list_rows(result, summary)
 
-        result = self.session.execute(query)
-        return result.scalars().all()
+    def page(
+        self,
+        filters: Dict[str, Any],
+        limit: int = 100,
+        before_id: Optional[int] = None,
+        load: Sequence[str] = (),
+        summary: bool = False,
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        One page of `list` plus the cursor of the next page, or None on the
+        last one. An extra row is fetched to know whether more remain.
+        """
+        rows = self.list(filters, limit=limit + 1, before_id=before_id, load=load, summary=summary)
+        return self.next_page(rows, limit)
 
     def update(self, id: Any, obj_in: dict) -> Optional[ModelType]:
         """Apply partial updates to an existing record."""
-        stmt = (
-            sqlalchemy_update(self.model)
-            .where(self.model.id == id, self.model.is_deleted == False)  # noqa: E712
-            .values(**obj_in)
-            .execution_options(synchronize_session="fetch")
-        )
-        self.session.execute(stmt)
+        self.session.execute(self.update_query(id, obj_in))
         self.session.flush()
         return self.get_by_id(id)
 
@@ -87,13 +213,7 @@ class BaseService(Generic[ModelType]):
         Soft‑delete a record by setting its `is_deleted` flag.
         Returns True if a record was marked deleted.
         """
-        stmt = (
-            sqlalchemy_update(self.model)
-            .where(self.model.id == id, self.model.is_deleted == False)  # noqa: E712
-            .values(is_deleted=True)  # type: ignore
-            .execution_options(synchronize_session="fetch")
-        )
-        result = self.session.execute(stmt)
+        result = self.session.execute(self.delete_query(id))
         self.session.flush()
         return result.rowcount > 0
 
@@ -111,11 +231,35 @@ class UserService(BaseService[User]):
         result = self.session.execute(query)
         return result.scalar_one_or_none()
 
+    def update(self, id: Any, obj_in: dict) -> Optional[User]:
+        """Apply partial updates and drop the cached snapshot of the user."""
+        user = super().update(id, obj_in)
+        mark_stale(self.session, id)
+        return user
+
+    def delete(self, id: Any) -> bool:
+        """Soft-delete the user and drop their cached snapshot."""
+        deleted = super().delete(id)
+        mark_stale(self.session, id)
+        return deleted
+
 
 class NoteService(BaseService[Note]):
+    summary_columns = ("id", "title", "is_ai_generated", "created_at", "updated_at")
+    excerpt_column = "content"
+
     def __init__(self, session: Session = Depends(get_db)):
         super().__init__(session, Note)
 
+    def add_categories(self, note_id: int, category_ids: List[int]) -> None:
+        """Link the note to all given categories in a single insert."""
+        if not category_ids:
+            return
+        self.session.execute(
+            category_note_association_table.insert(),
+            [{"category_id": category_id, "note_id": note_id} for category_id in category_ids],
+        )
+
 
 class CategoryService(BaseService[Category]):
     def __init__(self, session: Session = Depends(get_db)):
@@ -145,3 +289,308 @@ class QuizQuestionService(BaseService[QuizQuestion]):
     def __init__(self, session: Session = Depends(get_db)):
         super().__init__(session, QuizQuestion)
 
+
+
+class FileService(BaseService[File]):
+    def __init__(self, session: Session = Depends(get_db)):
+        super().__init__(session, File)
+
+    def register_upload(
+        self,
+        file_path: str,
+        name: str,
+        mimetype: str,
+        user_id: int,
+        sha256: Optional[str] = None,
+        task_id: Optional[str] = None,
+        collection_id: Optional[int] = None,
+    ) -> File:
+        """Record an uploaded file that is waiting to be ingested."""
+        return self.create(
+            {
+                "collection_id": collection_id,
+                "name": name[:64],
+                "file_path": str(file_path),
+                "mimetype": mimetype,
+                "sha256": sha256,
+                "user_id": user_id,
+                "uploaded_by": user_id,
+                "task_id": task_id,
+                "processing_stage": "queued",
+                "processing_progress": 0,
+            }
+        )
+
+    def get_ingested_by_sha256(self, sha256: str) -> Optional[File]:
+        """
+        Fetch any already ingested file with the same content hash, whoever
+        uploaded it. Its chunks are keyed by the hash and can be reused.
+        """
+        query = (
+            select(self.model)
+            .where(
+                self.model.sha256 == sha256,
+                self.model.is_processed == True,  # noqa: E712
+                self.model.is_deleted == False,  # noqa: E712
+            )
+            .limit(1)
+        )
+        result = self.session.execute(query)
+        return result.scalars().first()
+
+    def list_ingested_sha256(self, user_id: int, collection_id: Optional[int] = None) -> List[str]:
+        """Content hashes of the user's ingested files, optionally within one collection."""
+        query = select(self.model.sha256).distinct().where(
+            self.model.user_id == user_id,
+            self.model.sha256.is_not(None),
+            self.model.is_processed == True,  # noqa: E712
+            self.model.is_deleted == False,  # noqa: E712
+        )
+        if collection_id is not None:
+            query = query.where(self.model.collection_id == collection_id)
+        result = self.session.execute(query)
+        return sorted(result.scalars().all())
+
+    def set_progress(self, id: Any, stage: str, percent: int) -> None:
+        """Persist the current ingestion stage and percentage of a file."""
+        values = {"processing_stage": stage, "processing_progress": percent}
+        if stage in ("done", "skipped"):
+            values["is_processed"] = True
+        self.session.execute(
+            sqlalchemy_update(self.model)
+            .where(self.model.id == id)
+            .values(**values)
+        )
+        self.session.flush()
+
+
+class AsyncBaseService(BaseQueries[ModelType]):
+    """
+    `BaseService` over an `AsyncSession`, for endpoints that run on the
+    event loop. Lazy loads cannot run here, so every relationship a
+    response needs must be named in `load`.
+    """
+
+    def __init__(self, session: AsyncSession, model: Type[ModelType]):
+        super().__init__(session, model)
+
+    async def create(self, obj_in: dict) -> ModelType:
+        """Instantiate and persist a new model instance."""
+        try:
+            db_obj = self.model(**obj_in)  # noqa: E712
+            self.session.add(db_obj)
+            await self.session.flush()
+            return db_obj
+        except Exception as e:
+            print(f"Error creating {self.model.__name__}: {e}")
+            raise e
+
+    async def bulk_create(self, objs_in: List[dict]) -> List[int]:
+        """
+        Insert many records in one round-trip and return their ids in input
+        order. Rows are not loaded as instances; fetch them by id if needed.
+        """
+        if not objs_in:
+            return []
+        try:
+            result = await self.session.execute(self.bulk_insert_query(), objs_in)
+            return sorted(result.scalars().all())
+        except Exception as e:
+            print(f"Error bulk creating {self.model.__name__}: {e}")
+            raise e
+
+    async def get_by_id(self, id: Any, load: Sequence[str] = ()) -> Optional[ModelType]:
+        """
+        Fetch a single record by primary key, if not soft‑deleted, with
+        the relationships named in `load`.
+        """
+        result = await self.session.execute(self.get_by_id_query(id, load))
+        return result.scalar_one_or_none()
+
+    async def get_one(self, filters: Dict[str, Any], load: Sequence[str] = ()) -> Optional[ModelType]:
+        """
+        Fetch a single record matching the given filters,
+        excluding any soft‑deleted rows (is_deleted == True).
+        """
+        result = await self.session.execute(self.get_one_query(filters, load))
+        return result.scalar_one_or_none()
+
+    async def list(
+        self,
+        filters: Dict[str, Any],
+        skip: int = 0,
+        limit: int = 100,
+        before_id: Optional[int] = None,
+        load: Sequence[str] = (),
+        summary: bool = False,
+    ) -> List[ModelType]:
+        """
+        List non‑deleted records matching the given filters, newest first.
+        Pass `before_id` to seek past the last row of the previous page
+        (keyset pagination) instead of skipping rows with `skip`. Only the
+        relationships named in `load` are loaded. With `summary`, rows
+        hold only `summary_columns` and an `excerpt` instead of entities.
+        """
+        result = await self.session.execute(self.list_query(filters, skip, limit, before_id, load, summary))
+        return self.list_rows(result, summary)
+
+    async def page(
+        self,
+        filters: Dict[str, Any],
+        limit: int = 100,
+        before_id: Optional[int] = None,
+        load: Sequence[str] = (),
+        summary: bool = False,
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        One page of `list` plus the cursor of the next page, or None on the
+        last one. An extra row is fetched to know whether more remain.
+        """
+        rows = await self.list(filters, limit=limit + 1, before_id=before_id, load=load, summary=summary)
+        return self.next_page(rows, limit)
+
+    async def update(self, id: Any, obj_in: dict) -> Optional[ModelType]:
+        """Apply partial updates to an existing record."""
+        await self.session.execute(self.update_query(id, obj_in))
+        await self.session.flush()
+        return await self.get_by_id(id)
+
+    async def delete(self, id: Any) -> bool:
+        """
+        Soft‑delete a record by setting its `is_deleted` flag.
+        Returns True if a record was marked deleted.
+        """
+        result = await self.session.execute(self.delete_query(id))
+        await self.session.flush()
+        return result.rowcount > 0
+
+
+class AsyncNoteService(AsyncBaseService[Note]):
+    summary_columns = NoteService.summary_columns
+    excerpt_column = NoteService.excerpt_column
+
+    def __init__(self, session: AsyncSession = Depends(get_async_db)):
+        super().__init__(session, Note)
+
+    async def categories_by_note(self, note_ids: List[int]) -> Dict[int, List[Category]]:
+        """Categories of each of the notes, fetched in a single query."""
+        categories: Dict[int, List[Category]] = {note_id: [] for note_id in note_ids}
+        if not note_ids:
+            return categories
+        query = (
+            select(category_note_association_table.c.note_id, Category)
+            .join(Category, Category.id == category_note_association_table.c.category_id)
+            .where(
+                category_note_association_table.c.note_id.in_(note_ids),
+                Category.is_deleted == False,  # noqa: E712
+            )
+            .options(raiseload("*"))
+        )
+        result = await self.session.execute(query)
+        for note_id, category in result.all():
+            categories[note_id].append(category)
+        return categories
+
+    async def search(
+        self, user_id: int, text: str, limit: int = 20, after: Optional[Tuple[float, int]] = None
+    ) -> Tuple[List[Row], Optional[str]]:
+        """
+        Rank the user's notes against `text`, best first, each with a
+        highlighted `snippet`. `after` is the (rank, id) the previous page
+        ended on; the returned cursor encodes this page's.
+
+        Postgres ranks the generated `search_vector`; SQLite (through
+        aiosqlite) falls back to the `notes_fts` FTS5 table.
+        """
+        if self.session.bind.dialect.name == "postgresql":
+            query = self._postgres_search(user_id, text, limit + 1, after)
+        else:
+            query = self._sqlite_search(user_id, text, limit + 1, after)
+            if query is None:
+                return [], None
+        result = await self.session.execute(query)
+        rows = result.all()
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_rank_cursor(rows[-1].rank, rows[-1].id)
+
+    @staticmethod
+    def _after(rank, id_column, after: Optional[Tuple[float, int]]):
+        if after is None:
+            return true()
+        last_rank, last_id = after
+        return or_(rank < last_rank, and_(rank == last_rank, id_column < last_id))
+
+    def _postgres_search(self, user_id: int, text: str, limit: int, after: Optional[Tuple[float, int]]) -> Select:
+        tsquery = func.websearch_to_tsquery("english", text)
+        vector = literal_column("notes.search_vector")
+        ranked = (
+            select(Note.id, func.ts_rank_cd(vector, tsquery).label("rank"))
+            .where(
+                Note.creator_id == user_id,
+                Note.is_deleted == False,  # noqa: E712
+                vector.op("@@")(tsquery),
+            )
+            .subquery()
+        )
+        page = (
+            select(ranked)
+            .where(self._after(ranked.c.rank, ranked.c.id, after))
+            .order_by(ranked.c.rank.desc(), ranked.c.id.desc())
+            .limit(limit)
+            .subquery()
+        )
+        # ts_headline re-parses the content, so it only runs for the page.
+        snippet = func.ts_headline(
+            "english",
+            Note.content,
+            tsquery,
+            "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MinWords=10, MaxWords=30",
+        )
+        return (
+            select(*summary_columns(Note, self.summary_columns, None), page.c.rank, snippet.label("snippet"))
+            .join(page, page.c.id == Note.id)
+            .order_by(page.c.rank.desc(), Note.id.desc())
+        )
+
+    def _sqlite_search(self, user_id: int, text: str, limit: int, after: Optional[Tuple[float, int]]) -> Optional[Select]:
+        fts_query = match_query(text, operator="AND")
+        if fts_query is None:
+            return None
+        fts = table("notes_fts", literal_column("rowid"))
+        # bm25 is lower for better matches; titles weigh ten times the body.
+        rank = (-func.bm25(literal_column("notes_fts"), 10.0, 1.0)).label("rank")
+        snippet = func.snippet(literal_column("notes_fts"), -1, "<mark>", "</mark>", "…", 30).label("snippet")
+        ranked = (
+            select(*summary_columns(Note, self.summary_columns, None), rank, snippet)
+            .select_from(fts)
+            .join(Note, Note.id == literal_column("notes_fts.rowid"))
+            .where(
+                literal_column("notes_fts").op("MATCH")(fts_query),
+                Note.creator_id == user_id,
+                Note.is_deleted == False,  # noqa: E712
+            )
+            .subquery()
+        )
+        return (
+            select(ranked)
+            .where(self._after(ranked.c.rank, ranked.c.id, after))
+            .order_by(ranked.c.rank.desc(), ranked.c.id.desc())
+            .limit(limit)
+        )
+
+
+class AsyncCategoryService(AsyncBaseService[Category]):
+    def __init__(self, session: AsyncSession = Depends(get_async_db)):
+        super().__init__(session, Category)
+
+
+class AsyncCollectionService(AsyncBaseService[Collection]):
+    def __init__(self, session: AsyncSession = Depends(get_async_db)):
+        super().__init__(session, Collection)
+
+
+class AsyncQuizService(AsyncBaseService[Quiz]):
+    def __init__(self, session: AsyncSession = Depends(get_async_db)):
+        super().__init__(session, Quiz)
@@ -1,8 +1,93 @@
+import asyncio
+from typing import Any, Awaitable, List, Optional
+
+from app.dependencies.db import get_db_session
+from app.services import FileService
+from app.utils import logger
 from .worker import celery
 
+# One event loop per worker process, reused across tasks: the AI clients keep
+# async connection pools bound to the loop they were first used on.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_async(coro: Awaitable[Any]) -> Any:
+    """Run a coroutine to completion on this worker's event loop."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
+
 @celery.task(name="send_webpush_notification")
 def send_webpush_notification(data):
     """
     Send a web push notification using Celery.
     """
     pass
+
+
+@celery.task(name="ingest_files", bind=True)
+def ingest_files(self, file_ids: List[int]):
+    """
+    Parse, split and embed uploaded files into the vector store.
+
+    Progress is written to the `File` rows (`processing_stage`,
+    `processing_progress`, `is_processed`) and mirrored into the task state
+    so `/api/documents/jobs/{job_id}` can report it.
+    """
+    # Imported here so the web process never loads the ingestion stack.
+    from app.utils.data_ingestor import RAG
+
+    processed, failed = [], []
+    total = len(file_ids)
+
+    for index, file_id in enumerate(file_ids):
+        with get_db_session() as db:
+            file_service = FileService(db)
+            file = file_service.get_by_id(file_id)
+            duplicate = file and file.sha256 and file_service.get_ingested_by_sha256(file.sha256)
+            if duplicate:
+                # Identical content finished ingesting since this job was queued.
+                file_service.set_progress(file_id, "done", 100)
+        if file is None:
+            logger.error(f"Ingestion skipped, file {file_id} not found.")
+            failed.append(file_id)
+            continue
+        if duplicate:
+            processed.append(file_id)
+            continue
+
+        def report(stage: str, percent: int, file_id: int = file_id, index: int = index):
+            with get_db_session() as db:
+                FileService(db).set_progress(file_id, stage, percent)
+            self.update_state(
+                state="PROGRESS",
+                meta={
+                    "file_id": file_id,
+                    "stage": stage,
+                    "percent": percent,
+                    "current": index + 1,
+                    "total": total,
+                },
+            )
+
+        try:
+            # Chroma rejects None metadata values, so unset ids are left out.
+            metadata = {
+                key: value
+                for key, value in {
+                    "user_id": file.user_id,
+                    "file_id": file.id,
+                    "collection_id": file.collection_id,
+                }.items()
+                if value is not None
+            }
+            run_async(RAG.aingest_file(file.file_path, sha256=file.sha256, progress=report, metadata=metadata))
+            processed.append(file_id)
+        except Exception as e:
+            logger.error(f"Error ingesting file {file_id}: {e}")
+            report("failed", 0)
+            failed.append(file_id)
+
+    return {"processed": processed, "failed": failed}
@@ -8,4 +8,11 @@ celery = Celery(
     __name__,
     broker=config.CELERY_BROKER_URL,
     backend=config.CELERY_RESULT_BACKEND,
-)
\ No newline at end of file
+    include=["app.tasks.tasks"],
+)
+celery.conf.update(
+    task_track_started=True,
+    # Ingestion jobs are long and CPU/IO heavy; hand them out one at a time.
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+)
@@ -1,10 +1,11 @@
+import hashlib
 import os
 from pathlib import Path
-import shutil
-from typing import Dict
+from typing import Dict, Tuple
 import uuid
 import logging
 
+import aiofiles
 from fastapi import HTTPException, UploadFile
 from app.config import config
 from .security import JWTManager, PasswordManager
@@ -22,7 +23,9 @@ folder_by_content_type: Dict[str, str] = {
     # "audio": "audios",
 }
 
-def upload_file(file: UploadFile) -> Path:
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+def _upload_dir(file: UploadFile) -> Path:
     main_type = file.content_type.split("/")[0]
     folder_name = folder_by_content_type.get(main_type)
     
@@ -34,15 +37,49 @@ def upload_file(file: UploadFile) -> Path:
     
     upload_path = UPLOAD_DIR / folder_name
     upload_path.mkdir(parents=True, exist_ok=True)
+    return upload_path
 
-    filename_uuid = f"{uuid.uuid4()}{Path(file.filename).suffix}"
-    file_path = upload_path / filename_uuid
-    with file_path.open("wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
 
+def _store_upload(upload_path: Path, partial_path: Path, filename: str, sha256: str) -> Path:
+    file_path = upload_path / f"{sha256}{Path(filename).suffix.lower()}"
+    if file_path.exists():
+        partial_path.unlink()
+    else:
+        partial_path.replace(file_path)
     return file_path
 
 
+def upload_file(file: UploadFile) -> Tuple[Path, str]:
+    """
+    Stream an upload to disk while hashing it, and store it under its
+    sha256 so identical uploads share one file. Returns the path and digest.
+    """
+    upload_path = _upload_dir(file)
+    digest = hashlib.sha256()
+    partial_path = upload_path / f".{uuid.uuid4()}.part"
+    with partial_path.open("wb") as buffer:
+        for chunk in iter(lambda: file.file.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            buffer.write(chunk)
+
+    sha256 = digest.hexdigest()
+    return _store_upload(upload_path, partial_path, file.filename, sha256), sha256
+
+
+async def aupload_file(file: UploadFile) -> Tuple[Path, str]:
+    """Async `upload_file`, writing through aiofiles off the event loop."""
+    upload_path = _upload_dir(file)
+    digest = hashlib.sha256()
+    partial_path = upload_path / f".{uuid.uuid4()}.part"
+    async with aiofiles.open(partial_path, "wb") as buffer:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            await buffer.write(chunk)
+
+    sha256 = digest.hexdigest()
+    return _store_upload(upload_path, partial_path, file.filename, sha256), sha256
+
+
 def remove_existing_file(existing_image_path: str):
     existing_image_path = Path("uploads/" + existing_image_path)
     if existing_image_path.exists():
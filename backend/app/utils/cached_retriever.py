@@ -0,0 +1,25 @@
+from typing import Any, List
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from .search_cache import search_cache
+
+
+class CachedRetriever(BaseRetriever):
+    """Wrap a retriever so repeated queries are served from `search_cache`."""
+
+    retriever: BaseRetriever
+    namespace: str
+    cache: Any = None
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        def search(q: str) -> List[dict]:
+            docs = self.retriever.invoke(q, config={"callbacks": run_manager.get_child()})
+            return [{"page_content": d.page_content, "metadata": d.metadata} for d in docs]
+
+        cache = self.cache or search_cache
+        return [Document(**d) for d in cache.fetch(self.namespace, query, search)]
@@ -0,0 +1,65 @@
+import math
+import threading
+from typing import Dict, List, Sequence
+
+from .clients import get_embeddings
+from .vars import CATEGORY_MATCH_THRESHOLD, CATEGORY_MAX_MATCHES
+
+
+def cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class CategoryIndex:
+    """
+    Per-user index of category name embeddings, used to file a prompt under
+    the user's existing categories without a round-trip to the LLM.
+
+    Entries are dropped by `invalidate` when a user's categories change, and
+    rebuilt whenever the names passed to `match` differ from the cached ones,
+    so other workers' edits are picked up too.
+    """
+
+    def __init__(self, threshold: float = CATEGORY_MATCH_THRESHOLD, max_matches: int = CATEGORY_MAX_MATCHES):
+        self.threshold = threshold
+        self.max_matches = max_matches
+        self._vectors: Dict[int, Dict[str, List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._vectors.pop(user_id, None)
+
+    def _category_vectors(self, user_id: int, names: List[str]) -> Dict[str, List[float]]:
+        with self._lock:
+            cached = self._vectors.get(user_id)
+        if cached is not None and set(cached) == set(names):
+            return cached
+
+        vectors = dict(zip(names, get_embeddings().embed_documents(names)))
+        with self._lock:
+            self._vectors[user_id] = vectors
+        return vectors
+
+    def match(self, user_id: int, names: List[str], prompt: str) -> List[str]:
+        """
+        Return up to `max_matches` of the user's category names whose
+        similarity to the prompt reaches the threshold, best first. An empty
+        list means no category is close enough and the LLM should decide.
+        """
+        names = list(dict.fromkeys(name for name in names if name))
+        if not names:
+            return []
+
+        vectors = self._category_vectors(user_id, names)
+        query = get_embeddings().embed_query(prompt)
+        scored = sorted(
+            ((cosine_similarity(query, vector), name) for name, vector in vectors.items()),
+            reverse=True,
+        )
+        return [name for score, name in scored[:self.max_matches] if score >= self.threshold]
+
+
+category_index = CategoryIndex()
@@ -0,0 +1,112 @@
+"""
+Process-wide registry of the AI backends (embeddings, Chroma, Tavily, Groq).
+
+Nothing here is constructed at import time: each backend is built on first
+use, reused for the rest of the process, and its state is reported through
+`/health`. Workers that only serve CRUD routes never touch these backends.
+"""
+import threading
+from typing import Any, Callable, Dict
+
+from .vars import CHROMA_COLLECTION_NAME, CHROMA_DB_PATH, MODEL_NAME, OLLAMA_EMBED_MODEL
+
+
+class ClientRegistry:
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._clients: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        self._factories[name] = factory
+
+    def get(self, name: str) -> Any:
+        """Return the backend, constructing it on first use."""
+        client = self._clients.get(name)
+        if client is not None:
+            return client
+        with self._lock:
+            if name not in self._clients:
+                try:
+                    self._clients[name] = self._factories[name]()
+                    self._errors.pop(name, None)
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise RuntimeError(f"Could not initialize {name}: {e}") from e
+            return self._clients[name]
+
+    def readiness(self, warm: bool = False) -> Dict[str, str]:
+        """
+        Report each backend as `ready`, `not_initialized` or `error: ...`.
+        With `warm`, uninitialized backends are constructed first.
+        """
+        status = {}
+        for name in self._factories:
+            if warm and name not in self._clients:
+                try:
+                    self.get(name)
+                except RuntimeError:
+                    pass
+            if name in self._clients:
+                status[name] = "ready"
+            elif name in self._errors:
+                status[name] = f"error: {self._errors[name]}"
+            else:
+                status[name] = "not_initialized"
+        return status
+
+
+registry = ClientRegistry()
+
+
+def _build_embeddings():
+    from langchain_ollama import OllamaEmbeddings
+    from .embedding_cache import CachedEmbeddings
+
+    return CachedEmbeddings(OllamaEmbeddings(model=OLLAMA_EMBED_MODEL), OLLAMA_EMBED_MODEL)
+
+
+def _build_vector_store():
+    from langchain_chroma import Chroma
+
+    return Chroma(
+        collection_name=CHROMA_COLLECTION_NAME,
+        embedding_function=get_embeddings(),
+        persist_directory=CHROMA_DB_PATH,
+    )
+
+
+def _build_tavily_retriever():
+    from langchain_community.retrievers import TavilySearchAPIRetriever
+    from .cached_retriever import CachedRetriever
+
+    return CachedRetriever(retriever=TavilySearchAPIRetriever(k=3), namespace="tavily:k=3")
+
+
+def _build_llm():
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(model=MODEL_NAME, temperature=0.7)
+
+
+registry.register("embeddings", _build_embeddings)
+registry.register("vector_store", _build_vector_store)
+registry.register("tavily", _build_tavily_retriever)
+registry.register("llm", _build_llm)
+
+
+def get_embeddings():
+    return registry.get("embeddings")
+
+
+def get_vector_store():
+    return registry.get("vector_store")
+
+
+def get_tavily_retriever():
+    return registry.get("tavily")
+
+
+def get_llm():
+    return registry.get("llm")
@@ -0,0 +1,59 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import HTTPException, status
+
+from .vars import AI_MAX_CONCURRENCY, AI_QUEUE_TIMEOUT
+
+
+class GenerationLimiter:
+    """
+    Caps how many AI generations run at once in this process.
+
+    Generation handlers are async and wait on the LLM without holding a
+    threadpool slot, but each one still keeps sockets, memory and upstream
+    rate limit busy for tens of seconds. Requests past the limit queue for up
+    to `timeout` seconds and are then rejected with a 503.
+    """
+
+    def __init__(self, limit: int = AI_MAX_CONCURRENCY, timeout: float = AI_QUEUE_TIMEOUT):
+        self.limit = limit
+        self.timeout = timeout
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many AI generations in progress, please retry shortly",
+                headers={"Retry-After": str(int(self.timeout))},
+            )
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+        }
+
+
+generation_limiter = GenerationLimiter()
@@ -0,0 +1,134 @@
+"""
+Token-budgeted assembly of the retrieved context sent to the LLM.
+
+Passages from every retriever are ranked, stripped of the overlap the text
+splitter leaves between neighbouring chunks, deduplicated, and packed best
+first until the token budget of the chain is spent.
+"""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List
+
+from .vars import CHUNK_OVERLAP, CONTEXT_DUPLICATE_THRESHOLD, RRF_K
+
+SECTION_TITLES = {
+    "tavily": "Context from Web Search",
+    "chroma": "Context from Local Documents",
+}
+
+
+@lru_cache(maxsize=None)
+def _encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # tiktoken downloads its vocabulary on first use, which can fail offline.
+        print(f"Falling back to estimated token counts: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def shingles(text: str, size: int = 3) -> FrozenSet[str]:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= size:
+        return frozenset([" ".join(words)])
+    return frozenset(" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def strip_overlap(text: str, kept: str, max_overlap: int = CHUNK_OVERLAP * 2, min_overlap: int = 20) -> str:
+    """Drop the start or end of `text` that repeats the end or start of `kept`."""
+    for size in range(min(max_overlap, len(text), len(kept)), min_overlap - 1, -1):
+        if kept.endswith(text[:size]):
+            return text[size:].lstrip()
+        if kept.startswith(text[-size:]):
+            return text[:-size].rstrip()
+    return text
+
+
+@dataclass
+class Passage:
+    source: str
+    text: str
+    score: float
+    tokens: int = 0
+    shingles: FrozenSet[str] = frozenset()
+
+
+def rank_passages(retrieved_docs: Dict[str, List[Any]]) -> List[Passage]:
+    """
+    Score every retrieved document. Chunks carry the fused score from
+    hybrid retrieval; otherwise the retriever's own rank is turned into a
+    reciprocal rank score, so the sources are comparable.
+    """
+    passages = []
+    for source, docs in retrieved_docs.items():
+        for rank, doc in enumerate(docs, start=1):
+            score = doc.metadata.get("rrf_score") or 1.0 / (RRF_K + rank)
+            passages.append(Passage(source, doc.page_content.strip(), score))
+    passages.sort(key=lambda passage: passage.score, reverse=True)
+    return passages
+
+
+def select_passages(
+    passages: List[Passage],
+    budget: int,
+    duplicate_threshold: float = CONTEXT_DUPLICATE_THRESHOLD,
+) -> List[Passage]:
+    """Greedily keep the best passages that are new and still fit the budget."""
+    selected: List[Passage] = []
+    used = 0
+    for passage in passages:
+        text = passage.text
+        for kept in selected:
+            if text in kept.text:
+                text = ""
+                break
+            text = strip_overlap(text, kept.text)
+        if not text:
+            continue
+
+        passage.text = text
+        passage.shingles = shingles(text)
+        if any(jaccard(passage.shingles, kept.shingles) >= duplicate_threshold for kept in selected):
+            continue
+
+        passage.tokens = count_tokens(text)
+        if used + passage.tokens > budget:
+            continue
+        selected.append(passage)
+        used += passage.tokens
+    return selected
+
+
+def build_context(retrieved_docs: Dict[str, List[Any]], budget: int) -> str:
+    """
+    Render the retrieved documents into at most `budget` tokens of context,
+    one section per retriever.
+    """
+    sources = list(retrieved_docs)
+    headers = {source: f"--- {SECTION_TITLES.get(source, source)} ---" for source in sources}
+    header_tokens = sum(count_tokens(header) for header in headers.values())
+    selected = select_passages(rank_passages(retrieved_docs), max(0, budget - header_tokens))
+
+    sections = []
+    for source in sources:
+        texts = [passage.text for passage in selected if passage.source == source]
+        sections.append(headers[source] + "\n" + "\n\n".join(texts))
+    used = header_tokens + sum(passage.tokens for passage in selected)
+    print(f"Context: {len(selected)} passages, {used}/{budget} tokens")
+    return "\n\n".join(sections)
@@ -2,19 +2,28 @@ import re
 import pprint
 import os
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
 from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
-from langchain_community.retrievers import TavilySearchAPIRetriever
-from langchain_core.runnables import RunnablePassthrough, RunnableParallel, RunnableLambda
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import OllamaEmbeddings
+from langchain_core.runnables import ConfigurableField, RunnablePassthrough, RunnableParallel, RunnableLambda
+from langchain_core.callbacks import BaseCallbackHandler
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional
 # from vars import CHROMA_COLLECTION_NAME, CHROMA_DB_PATH, OLLAMA_EMBED_MODEL, MODEL_NAME
 import asyncio
+import threading
+import aiofiles
+import time
 from pathlib import Path
-from .ingest import list_of_ingested_files
+from functools import lru_cache
+from types import SimpleNamespace
+from .clients import get_llm, get_tavily_retriever, get_vector_store
+from .hybrid_retriever import HybridRetriever
+from .keyword_index import get_keyword_index
+from .context_builder import build_context
+from .vars import QUIZ_CONTEXT_TOKENS, WRITER_CONTEXT_TOKENS
+from .category_index import category_index
+from .response_cache import response_cache
+from . import logger
 
 load_dotenv()
 
@@ -62,36 +71,6 @@ parser_categorizer = JsonOutputParser(pydantic_object=Categories)
 parser_quiz = JsonOutputParser(pydantic_object=Quiz)
 parser_writer = StrOutputParser()
 
-try:
-    embeddings = OllamaEmbeddings(model=OLLAMA_EMBED_MODEL)
-except Exception as e:
-    print(f"Error initializing OllamaEmbeddings: {e}")
-    print(
-        f"Ensure Ollama is running and the model '{OLLAMA_EMBED_MODEL}' is available.")
-    exit()
-
-try:
-    vector_store = Chroma(
-        collection_name=CHROMA_COLLECTION_NAME,
-        embedding_function=embeddings,
-        persist_directory=CHROMA_DB_PATH,
-    )
-    # METADATA FILTERING
-    filter_dict = {"name": {"$in": list_of_ingested_files}}
-    chroma_retriever = vector_store.as_retriever(
-        search_kwargs={"k": 10})
-except Exception as e:
-    print(f"Error initializing Chroma DB from {CHROMA_DB_PATH}: {e}")
-    print("Ensure the Chroma DB directory exists and is accessible.")
-    exit()
-
-try:
-    tavily_retriever = TavilySearchAPIRetriever(k=3)
-except Exception as e:
-    print(f"Error initializing TavilySearchAPIRetriever: {e}")
-    print("Please ensure the TAVILY_API_KEY environment variable is set correctly.")
-    exit()
-
 template_categorizer = """
 You are an expert categorization assistant that intelligently classifies user prompts into meaningful categories.
 You have access to these existing categories: {categories}.
@@ -209,15 +188,6 @@ prompt_categorizer = PromptTemplate(
 
 prompt_writer = ChatPromptTemplate.from_template(template_writer)
 prompt_quiz = ChatPromptTemplate.from_template(template_quiz)
-try:
-    client = ChatGroq(model=MODEL_NAME, temperature=0.7)
-except Exception as e:
-    print(f"Error initializing ChatGroq: {e}")
-    print("Please ensure the GROQ_API_KEY environment variable is set correctly.")
-    exit()
-
-chain_categorizer = prompt_categorizer | client | parser_categorizer
-
 
 def extract_title(text):
     start_tag = "**Title:**"
@@ -231,108 +201,253 @@ def extract_title(text):
     return title, content
 
 
-def format_docs(docs: List[Any]) -> str:
-    return "\n\n".join(doc.page_content for doc in docs)
+def combine_contexts(retrieved_docs: Dict[str, List[Any]], budget: int = WRITER_CONTEXT_TOKENS) -> str:
+    return build_context(retrieved_docs, budget)
 
 
-def combine_contexts(retrieved_docs: Dict[str, List[Any]]) -> str:
-    formatted_tavily = format_docs(retrieved_docs.get('tavily', []))
-    print(f"\n\n\n\nRETRIEVED TAVILY DOCS : {formatted_tavily} \n\n\n\n")
-    formatted_chroma = format_docs(retrieved_docs.get('chroma', []))
-    print(f"\n\n\n\nRETRIEVED CHROMA DOCS : {formatted_chroma} \n\n\n\n")
+class StageTimer(BaseCallbackHandler):
+    """
+    Callback that records the wall-clock duration of the named stages
+    (`categorizer`, `retrieval`, `writer`, `quiz`) of a chain run, so the
+    critical path of a generation can be logged.
+    """
 
-    return f"--- Context from Web Search ---\n{formatted_tavily}\n\n--- Context from Local Documents ---\n{formatted_chroma}"
+    STAGES = ("categorizer", "retrieval", "writer", "quiz")
 
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+        self._running: Dict[Any, tuple] = {}
+        self._lock = threading.Lock()
 
-retrieval_chain_search = RunnableParallel(
-    tavily=tavily_retriever,
-    # chroma=chroma_retriever
-) | RunnableLambda(combine_contexts)
+    def on_chain_start(self, serialized, inputs, *, run_id, **kwargs):
+        name = kwargs.get("name")
+        if name in self.STAGES:
+            with self._lock:
+                self._running[run_id] = (name, time.perf_counter())
 
-retrieval_chain_rag = RunnableParallel(
-    chroma=chroma_retriever
-) | RunnableLambda(combine_contexts)
+    def _finish(self, run_id):
+        with self._lock:
+            stage = self._running.pop(run_id, None)
+            if stage is not None:
+                name, started = stage
+                self.timings[name] = round((time.perf_counter() - started) * 1000, 1)
 
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
 
-retrieval_chain_quiz_rag = RunnableParallel(
-    chroma=chroma_retriever
-) | RunnableLambda(combine_contexts)
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id)
 
-retrieval_chain_quiz_search = RunnableParallel(
-    tavily=tavily_retriever,
+    def report(self) -> Dict[str, float]:
+        timings = dict(self.timings)
+        timings["total"] = round((time.perf_counter() - self.started_at) * 1000, 1)
+        return timings
 
-) | RunnableLambda(combine_contexts)
 
-chain_writer_search = (
-    RunnablePassthrough.assign(
-        context=RunnableLambda(
-            lambda x: x['user_prompt']) | retrieval_chain_search
+@lru_cache(maxsize=None)
+def get_chains() -> SimpleNamespace:
+    """
+    Compose the categorizer, writer and quiz chains on first use.
+    The backends come from the lazy client registry, so importing this
+    module does not construct any of them.
+    """
+    client = get_llm()
+    tavily_retriever = get_tavily_retriever()
+    # The documents searched are chosen per request, see `scoped_config`.
+    chroma_retriever = HybridRetriever(
+        vector_store=get_vector_store(), keyword_index=get_keyword_index()
+    ).configurable_fields(
+        sources=ConfigurableField(id="retrieval_sources")
     )
-    | prompt_writer
-    | client
-    | parser_writer
-)
 
-chain_writer_rag = (
-    RunnablePassthrough.assign(
-        context=RunnableLambda(
-            lambda x: x['user_prompt']) | retrieval_chain_rag
-    )
-    | prompt_writer
-    | client
-    | parser_writer
-)
+    chain_categorizer = (
+        prompt_categorizer | client | parser_categorizer
+    ).with_config(run_name="categorizer")
 
+    retrieval_chain_search = RunnableParallel(
+        tavily=tavily_retriever,
+        # chroma=chroma_retriever
+    ) | RunnableLambda(combine_contexts)
 
-chain_quiz_rag = (
-    RunnablePassthrough.assign(
-        context=RunnableLambda(
-            lambda x: x['user_prompt']) | retrieval_chain_quiz_rag
+    retrieval_chain_rag = RunnableParallel(
+        chroma=chroma_retriever
+    ) | RunnableLambda(combine_contexts)
+
+    # Quizzes need less material than notes, so they get a smaller budget.
+    combine_quiz_contexts = RunnableLambda(
+        lambda docs: combine_contexts(docs, QUIZ_CONTEXT_TOKENS)
     )
-    | prompt_quiz
-    | client
-    | parser_quiz
-)
 
-chain_quiz_search = (
-    RunnablePassthrough.assign(
-        context=RunnableLambda(
-            lambda x: x['user_prompt']) | retrieval_chain_quiz_search
+    retrieval_chain_quiz_rag = RunnableParallel(
+        chroma=chroma_retriever
+    ) | combine_quiz_contexts
+
+    retrieval_chain_quiz_search = RunnableParallel(
+        tavily=tavily_retriever,
+    ) | combine_quiz_contexts
+
+    chain_writer_search = (
+        RunnablePassthrough.assign(
+            context=RunnableLambda(
+                lambda x: x['user_prompt']) | retrieval_chain_search
+        ).with_config(run_name="retrieval")
+        | prompt_writer
+        | client
+        | parser_writer
+    ).with_config(run_name="writer")
+
+    chain_writer_rag = (
+        RunnablePassthrough.assign(
+            context=RunnableLambda(
+                lambda x: x['user_prompt']) | retrieval_chain_rag
+        ).with_config(run_name="retrieval")
+        | prompt_writer
+        | client
+        | parser_writer
+    ).with_config(run_name="writer")
+
+    chain_quiz_rag = (
+        RunnablePassthrough.assign(
+            context=RunnableLambda(
+                lambda x: x['user_prompt']) | retrieval_chain_quiz_rag
+        ).with_config(run_name="retrieval")
+        | prompt_quiz
+        | client
+        | parser_quiz
+    ).with_config(run_name="quiz")
+
+    chain_quiz_search = (
+        RunnablePassthrough.assign(
+            context=RunnableLambda(
+                lambda x: x['user_prompt']) | retrieval_chain_quiz_search
+        ).with_config(run_name="retrieval")
+        | prompt_quiz
+        | client
+        | parser_quiz
+    ).with_config(run_name="quiz")
+
+    # Categorizing and writing are independent: run them side by side so
+    # the categorizer round-trip is off the critical path.
+    chain_note_search = RunnableParallel(
+        categories=chain_categorizer, note=chain_writer_search
+    )
+    chain_note_rag = RunnableParallel(
+        categories=chain_categorizer, note=chain_writer_rag
+    )
+
+    return SimpleNamespace(
+        categorizer=chain_categorizer,
+        note_search=chain_note_search,
+        note_rag=chain_note_rag,
+        writer_search=chain_writer_search,
+        writer_rag=chain_writer_rag,
+        quiz_rag=chain_quiz_rag,
+        quiz_search=chain_quiz_search,
     )
-    | prompt_quiz
-    | client
-    | parser_quiz
-)
 
-def create_note(all_categories, user_prompt: str, rag_enabled: bool = False) -> Dict[str, Any]:
 
+def scoped_config(sources: List[str], callbacks: List[Any]) -> Dict[str, Any]:
+    """
+    Run config restricting document retrieval to the chunks of the documents
+    whose sha256 are in `sources`. Without sources the search is unscoped.
+    """
+    config: Dict[str, Any] = {"callbacks": callbacks}
+    if sources:
+        config["configurable"] = {"retrieval_sources": list(sources)}
+    return config
+
+
+def match_categories(user_id: Optional[int], all_categories, user_prompt: str) -> Optional[Dict[str, Any]]:
+    """
+    File the prompt under the user's existing categories by embedding
+    similarity. Returns None when nothing is close enough (or the index is
+    unavailable), in which case the LLM categorizer should decide.
+    """
+    if user_id is None or not all_categories:
+        return None
     try:
-        print(f"Categorizing prompt: '{user_prompt}'")
-        categorizer_result = chain_categorizer.invoke({
-            "categories": ", ".join(all_categories),
-            "user_prompt": user_prompt
-        })
+        matched = category_index.match(user_id, list(all_categories), user_prompt)
+    except Exception as e:
+        logger.error(f"Category index unavailable, falling back to the LLM: {e}")
+        return None
+    return {"category": matched, "created": False} if matched else None
+
+
+async def acreate_note(
+    all_categories,
+    user_prompt: str,
+    rag_enabled: bool = False,
+    user_id: Optional[int] = None,
+    sources: List[str] = (),
+) -> Dict[str, Any]:
+    """
+    Generate a note and its categories. `sources` are the sha256 of the
+    documents the note is grounded on: RAG retrieval is restricted to them
+    and they scope the response cache.
 
+    The chains run through `ainvoke`, so the event loop is only held while
+    no LLM or search call is pending.
+    """
+
+    try:
+        chains = get_chains()
         print(
-            f"\nGenerating note for prompt: '{user_prompt}' using Tavily search and Chroma DB...")
+            f"\nCategorizing and generating note for prompt: '{user_prompt}' using Tavily search and Chroma DB...")
         print("-" * 20)
-        if rag_enabled:
-            writer_result = chain_writer_rag.invoke(
-                {"user_prompt": user_prompt})
-        else:
-            writer_result = chain_writer_search.invoke(
-                {"user_prompt": user_prompt})
+        timer = StageTimer()
+        config = scoped_config(sources, [timer])
+        mode = "rag" if rag_enabled else "search"
+        categorizer_result = await asyncio.to_thread(match_categories, user_id, all_categories, user_prompt)
+        timer.timings["category_match"] = timer.report()["total"]
+        writer_result = await asyncio.to_thread(response_cache.get, "note", user_prompt, mode, sources)
+        cached = writer_result is not None
+
+        if cached and categorizer_result is None:
+            categorizer_result = await chains.categorizer.ainvoke(
+                {
+                    "categories": ", ".join(all_categories),
+                    "user_prompt": user_prompt
+                },
+                config=config,
+            )
+        elif categorizer_result is not None and not cached:
+            writer = chains.writer_rag if rag_enabled else chains.writer_search
+            writer_result = await writer.ainvoke(
+                {"user_prompt": user_prompt}, config=config
+            )
+        elif not cached:
+            chain_note = chains.note_rag if rag_enabled else chains.note_search
+            result = await chain_note.ainvoke(
+                {
+                    "categories": ", ".join(all_categories),
+                    "user_prompt": user_prompt
+                },
+                config=config,
+            )
+            categorizer_result, writer_result = result["categories"], result["note"]
+
+        if not cached:
+            await asyncio.to_thread(response_cache.set, "note", user_prompt, mode, sources, writer_result)
+
+        timings = timer.report()
+        logger.info(f"AI note stage timings (ms): {timings}")
 
         # Extract the title
         title, content = extract_title(writer_result)
         print(f"Title: {title}")
         print(f"Content: {content}")
         output_filename = "output.md"
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            f.write(writer_result)
+        async with aiofiles.open(output_filename, 'w', encoding='utf-8') as f:
+            await f.write(writer_result)
         print(f"Note saved to {output_filename}")
 
-        return {"title": title, "note_content": content, "categories": categorizer_result}
+        return {
+            "title": title,
+            "note_content": content,
+            "categories": categorizer_result,
+            "timings": timings,
+        }
 
     except Exception as e:
         print(f"\nAn error occurred during processing: {e}")
@@ -342,20 +457,94 @@ def create_note(all_categories, user_prompt: str, rag_enabled: bool = False) ->
         return {"note_content": None, "categories": None, "error": str(e)}
 
 
-def create_quiz(user_prompt_input: str, rag_enabled: bool = False) -> Dict[str, Any]:
+def create_note(
+    all_categories,
+    user_prompt: str,
+    rag_enabled: bool = False,
+    user_id: Optional[int] = None,
+    sources: List[str] = (),
+) -> Dict[str, Any]:
+    """Blocking `acreate_note`, for scripts and workers without an event loop."""
+    return asyncio.run(acreate_note(all_categories, user_prompt, rag_enabled, user_id, sources))
+
+
+async def stream_note(
+    all_categories,
+    user_prompt: str,
+    rag_enabled: bool = False,
+    user_id: Optional[int] = None,
+    sources: List[str] = (),
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a note while it is being written.
+
+    Yields `{"token": str}` for every chunk the writer produces, then a final
+    `{"title", "note_content", "categories", "timings"}` once the note is complete. The
+    categorizer runs in the background, unless the category index already
+    matched the prompt, and is awaited at the end. A cached note is sent as a
+    single token.
+    """
+    chains = get_chains()
+    timer = StageTimer()
+    config = scoped_config(sources, [timer])
+    mode = "rag" if rag_enabled else "search"
+    categories = await asyncio.to_thread(match_categories, user_id, all_categories, user_prompt)
+    timer.timings["category_match"] = timer.report()["total"]
+    categorizer = None
+    if categories is None:
+        categorizer = asyncio.create_task(chains.categorizer.ainvoke({
+            "categories": ", ".join(all_categories),
+            "user_prompt": user_prompt
+        }, config=config))
+    writer = chains.writer_rag if rag_enabled else chains.writer_search
+    writer_result = await asyncio.to_thread(response_cache.get, "note", user_prompt, mode, sources)
+
+    try:
+        if writer_result is not None:
+            yield {"token": writer_result}
+        else:
+            parts = []
+            async for chunk in writer.astream({"user_prompt": user_prompt}, config=config):
+                parts.append(chunk)
+                yield {"token": chunk}
+            writer_result = "".join(parts)
+            await asyncio.to_thread(response_cache.set, "note", user_prompt, mode, sources, writer_result)
+    except BaseException:
+        if categorizer is not None:
+            categorizer.cancel()
+        raise
+
+    title, content = extract_title(writer_result)
+    if categorizer is not None:
+        categories = await categorizer
+    timings = timer.report()
+    logger.info(f"Streamed AI note stage timings (ms): {timings}")
+    yield {"title": title, "note_content": content, "categories": categories, "timings": timings}
+
+
+async def acreate_quiz(
+    user_prompt_input: str, rag_enabled: bool = False, sources: List[str] = ()
+) -> Dict[str, Any]:
     """
     HAVEN'T YET IMPLEMENTED RAG CHECK FOR QUIZ GENERATION
     """
     try:
-
+        chains = get_chains()
         print(
             f"\nGenerating quiz for prompt: '{user_prompt_input}' using Tavily search and Chroma DB...")
         print("-" * 20)
 
+        mode = "rag" if rag_enabled else "search"
+        quiz_result = await asyncio.to_thread(response_cache.get, "quiz", user_prompt_input, mode, sources)
+        if quiz_result is not None:
+            return {"quiz_content": quiz_result}
+
+        config = scoped_config(sources, [])
         if rag_enabled:
-            quiz_result = chain_quiz_rag.invoke({"user_prompt": user_prompt_input})
+            quiz_result = await chains.quiz_rag.ainvoke({"user_prompt": user_prompt_input}, config=config)
         else:
-            quiz_result = chain_quiz_search.invoke({"user_prompt": user_prompt_input})
+            quiz_result = await chains.quiz_search.ainvoke({"user_prompt": user_prompt_input}, config=config)
+        await asyncio.to_thread(response_cache.set, "quiz", user_prompt_input, mode, sources, quiz_result)
 
         return {"quiz_content": quiz_result}
 
@@ -364,7 +553,12 @@ def create_quiz(user_prompt_input: str, rag_enabled: bool = False) -> Dict[str,
         if "TAVILY_API_KEY" in str(e):
             print(
                 "Please ensure your TAVILY_API_KEY environment variable is set correctly.")
-        # return {"note_content": None, "categories": None, "error": str(e)}
+        raise
+
+
+def create_quiz(user_prompt_input: str, rag_enabled: bool = False, sources: List[str] = ()) -> Dict[str, Any]:
+    """Blocking `acreate_quiz`, for scripts and workers without an event loop."""
+    return asyncio.run(acreate_quiz(user_prompt_input, rag_enabled, sources))
 
 
 # if __name__ == "__main__":
@@ -1,68 +1,144 @@
+import asyncio
+from typing import Callable, List, Optional
 from uuid import uuid4
 from langchain.document_loaders import PyPDFLoader
-from langchain_chroma import Chroma
-from langchain_ollama import OllamaEmbeddings
+from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 # from config import config
 from dotenv import load_dotenv
-from uuid import uuid4
-from .vars import *
+from .vars import CHUNK_OVERLAP, CHUNK_SIZE, EMBED_BATCH_SIZE, EMBED_CONCURRENCY
+from .clients import get_embeddings, get_vector_store
+from .embedding_cache import uncounted
+from .keyword_index import get_keyword_index
 load_dotenv()
 
+ProgressCallback = Callable[[str, int], None]
+
+
 class RAG:
     """Class to handle the ingestion of PDF files into a vector store."""
-    
-    embeddings = OllamaEmbeddings(model=OLLAMA_EMBED_MODEL)
-    
-    vector_store = Chroma(
-        collection_name=CHROMA_COLLECTION_NAME,
-        embedding_function=embeddings,
-        persist_directory=CHROMA_DB_PATH,
-    )
-    
+
     @classmethod
-    def ingest_file(cls, file_path: str):
-        """Loads, splits, cleans, and ingests a single PDF file into Chroma."""
-        
+    async def aingest_file(
+        cls,
+        file_path: str,
+        sha256: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+        metadata: Optional[dict] = None,
+    ) -> List[str]:
+        """
+        Loads, splits, cleans, and ingests a single PDF file into Chroma and
+        the keyword index.
+
+        When the file's `sha256` is given, chunk ids are derived from it
+        (`<sha256>-<n>`) and stored in the chunk metadata, so re-ingesting the
+        same content overwrites rather than duplicates its chunks.
+        `metadata` (owner, file and collection ids) is copied onto every
+        chunk so retrieval can filter on it.
+
+        `progress` is called with a stage name and a 0-100 percentage as the
+        file moves through parsing, splitting and embedding. Returns the ids
+        of the chunks written to the vector store.
+
+        The caller owns the event loop; blocking parsing and index writes
+        run in threads.
+        """
+        report = progress or (lambda stage, percent: None)
+
         if not file_path.lower().endswith('.pdf'):
             print(f"Skipping non-PDF file: {file_path}")
-            return
-
-        try:
-            print(f"Loading PDF: {file_path}")
-            loader = PyPDFLoader(file_path=file_path)
-            loaded_documents = loader.load()
-            
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=CHUNK_SIZE,
-                chunk_overlap=CHUNK_OVERLAP,
-                separators=["\n\n", "\n", " ", ""]
-            )
-            docs = text_splitter.split_documents(loaded_documents)
-            cleaned_docs = []
-            doc_ids = []
-            for i, doc in enumerate(docs):
-                try:
-                    cleaned_content = doc.page_content.encode('utf-8', errors='replace').decode('utf-8')
-
-                    if not cleaned_content.strip():
-                        continue
-                    
-                    doc.page_content = cleaned_content
-                    cleaned_docs.append(doc)
-                    doc_ids.append(str(uuid4()))
-                except Exception as e:
+            report("skipped", 100)
+            return []
+
+        print(f"Loading PDF: {file_path}")
+        report("parsing", 0)
+        loader = PyPDFLoader(file_path=file_path)
+        loaded_documents = await asyncio.to_thread(loader.load)
+
+        report("splitting", 10)
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=CHUNK_OVERLAP,
+            separators=["\n\n", "\n", " ", ""]
+        )
+        docs = text_splitter.split_documents(loaded_documents)
+        cleaned_docs = []
+        doc_ids = []
+        for i, doc in enumerate(docs):
+            try:
+                cleaned_content = doc.page_content.encode('utf-8', errors='replace').decode('utf-8')
+
+                if not cleaned_content.strip():
                     continue
 
-            if cleaned_docs: 
-                cls.vector_store.add_documents(documents=cleaned_docs, ids=doc_ids)
-                
-            else:
-                pass
+                doc.page_content = cleaned_content
+                if metadata:
+                    doc.metadata.update(metadata)
+                if sha256:
+                    doc.metadata["sha256"] = sha256
+                    doc_ids.append(f"{sha256}-{len(cleaned_docs)}")
+                else:
+                    doc_ids.append(str(uuid4()))
+                cleaned_docs.append(doc)
+            except Exception as e:
+                continue
+
+        report("embedding", 20)
+        if cleaned_docs:
+            await cls.embed_and_store(cleaned_docs, doc_ids, report)
+            # Same ids as in Chroma, so hybrid retrieval can fuse the two.
+            await asyncio.to_thread(
+                get_keyword_index().add,
+                doc_ids,
+                [doc.page_content for doc in cleaned_docs],
+                [doc.metadata for doc in cleaned_docs],
+            )
+
+        report("done", 100)
+        return doc_ids
+
+    @classmethod
+    async def embed_and_store(
+        cls, docs: List[Document], ids: List[str], report: ProgressCallback
+    ) -> None:
+        """
+        Embeds `docs` in batches of EMBED_BATCH_SIZE with at most
+        EMBED_CONCURRENCY requests in flight, writing each batch to Chroma
+        as soon as its vectors are back.
+
+        Vectors land in the embedding cache, which is also the vector
+        store's embedding function, so `add_texts` reads them back from it
+        instead of calling Ollama again; that read-back is left out of the
+        cache's hit rate. Chunk ids are stable, so writes overwrite earlier
+        copies of the same chunk.
+        """
+        embeddings = get_embeddings()
+        vector_store = get_vector_store()
+        semaphore = asyncio.Semaphore(EMBED_CONCURRENCY)
+        batches = [
+            (docs[start:start + EMBED_BATCH_SIZE], ids[start:start + EMBED_BATCH_SIZE])
+            for start in range(0, len(docs), EMBED_BATCH_SIZE)
+        ]
+        completed = 0
+
+        async def embed_batch(batch_docs: List[Document], batch_ids: List[str]) -> None:
+            nonlocal completed
+            texts = [doc.page_content for doc in batch_docs]
+            async with semaphore:
+                await embeddings.aembed_documents(texts)
+            # Chroma's client is blocking, keep the loop free for the other batches.
+            with uncounted():
+                await asyncio.to_thread(
+                    vector_store.add_texts,
+                    texts,
+                    metadatas=[doc.metadata for doc in batch_docs],
+                    ids=batch_ids,
+                )
+            completed += 1
+            report("embedding", 20 + (79 * completed) // len(batches))
 
-        except Exception as e:
-            pass
+        await asyncio.gather(*(embed_batch(*batch) for batch in batches))
 
 if __name__ == "__main__":
     rag = RAG()
-    rag.ingest_file("/home/aishik/Documents/Programming/Hackathons/Hack4Bengal2025/backend/uploads/documents/4b973b38-a0f5-4dda-a503-2bea6b73badf.pdf")
\ No newline at end of file
+    asyncio.run(rag.aingest_file("/home/aishik/Documents/Programming/Hackathons/Hack4Bengal2025/backend/uploads/documents/4b973b38-a0f5-4dda-a503-2bea6b73badf.pdf"))
\ No newline at end of file
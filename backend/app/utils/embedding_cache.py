@@ -0,0 +1,187 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from langchain_core.embeddings import Embeddings
+
+from .vars import EMBED_CACHE_MAX_ENTRIES, EMBED_CACHE_PATH
+
+
+# False while vectors the caller has just embedded are read back, so those
+# reads are not counted as cache hits.
+_count_lookups: ContextVar[bool] = ContextVar("count_lookups", default=True)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@contextmanager
+def uncounted():
+    """Read vectors from the cache without updating the hit and miss counters."""
+    token = _count_lookups.set(False)
+    try:
+        yield
+    finally:
+        _count_lookups.reset(token)
+
+
+class EmbeddingCache:
+    """
+    On-disk store of embedding vectors keyed by (model, sha256(text)).
+
+    Vectors are kept as packed float32 blobs in SQLite (WAL mode, so the API
+    and Celery processes can share the file). Once the table grows past
+    `max_entries` the least recently used rows are evicted.
+    """
+
+    def __init__(self, path: str = EMBED_CACHE_PATH, max_entries: int = EMBED_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, hash)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used)"
+        )
+
+    def get_many(self, model: str, texts: Sequence[str], count: bool = True) -> List[Optional[List[float]]]:
+        """
+        Return the cached vector for each text, or None where it is missing.
+        Counts towards the hit rate unless `count` is False.
+        """
+        hashes = [text_hash(text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit.
+            for start in range(0, len(hashes), 500):
+                batch = list(set(hashes[start:start + 500]))
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(batch))})",
+                    [model, *batch],
+                ).fetchall()
+                for hash, vector in rows:
+                    found[hash] = array("f", vector).tolist()
+            if found:
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND hash = ?",
+                    [(time.time(), model, hash) for hash in found],
+                )
+
+        vectors = [found.get(hash) for hash in hashes]
+        if count:
+            hits = sum(vector is not None for vector in vectors)
+            self.hits += hits
+            self.misses += len(vectors) - hits
+        return vectors
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Store vectors for texts, then evict down to `max_entries`."""
+        now = time.time()
+        rows = [
+            (model, text_hash(text), array("f", vector).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute(
+                """
+                DELETE FROM embeddings WHERE rowid IN (
+                    SELECT rowid FROM embeddings ORDER BY last_used ASC
+                    LIMIT max(0, (SELECT COUNT(*) FROM embeddings) - ?)
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide embedding cache."""
+    return EmbeddingCache()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that only sends texts missing from the cache to the
+    underlying model. Queries are cached under their own namespace, since
+    some models embed queries and documents differently.
+    """
+
+    def __init__(self, embeddings: Embeddings, model: str, cache: Optional[EmbeddingCache] = None):
+        self.embeddings = embeddings
+        self.model = model
+        self.cache = cache or get_embedding_cache()
+
+    def _split(self, namespace: str, texts: List[str]):
+        vectors = self.cache.get_many(namespace, texts, count=_count_lookups.get())
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        return vectors, missing
+
+    def _merge(self, namespace, texts, vectors, missing, embedded) -> List[List[float]]:
+        if missing:
+            self.cache.put_many(namespace, missing, embedded)
+            by_text = dict(zip(missing, embedded))
+            vectors = [vector if vector is not None else by_text[text] for text, vector in zip(texts, vectors)]
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors, missing = self._split(self.model, texts)
+        embedded = self.embeddings.embed_documents(missing) if missing else []
+        return self._merge(self.model, texts, vectors, missing, embedded)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors, missing = self._split(self.model, texts)
+        embedded = await self.embeddings.aembed_documents(missing) if missing else []
+        return self._merge(self.model, texts, vectors, missing, embedded)
+
+    def embed_query(self, text: str) -> List[float]:
+        namespace = f"{self.model}:query"
+        vectors, missing = self._split(namespace, [text])
+        embedded = [self.embeddings.embed_query(text)] if missing else []
+        return self._merge(namespace, [text], vectors, missing, embedded)[0]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        namespace = f"{self.model}:query"
+        vectors, missing = self._split(namespace, [text])
+        embedded = [await self.embeddings.aembed_query(text)] if missing else []
+        return self._merge(namespace, [text], vectors, missing, embedded)[0]
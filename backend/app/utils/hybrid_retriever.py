@@ -0,0 +1,57 @@
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from .vars import RETRIEVAL_FETCH_K, RETRIEVAL_K, RRF_K
+
+
+def reciprocal_rank_fusion(rankings: List[List[Document]], rrf_k: int = RRF_K) -> List[Document]:
+    """
+    Merge ranked lists by summing `1 / (rrf_k + rank)` per document. Chunks
+    are matched on their text, so identical chunks from either list merge.
+    The fused score is stored in `metadata["rrf_score"]`.
+    """
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = doc.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            documents.setdefault(key, doc)
+    fused = sorted(documents, key=lambda key: scores[key], reverse=True)
+    for key in fused:
+        documents[key].metadata["rrf_score"] = scores[key]
+    return [documents[key] for key in fused]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Dense search in Chroma plus BM25 search in the keyword index, fused
+    with reciprocal rank fusion. Both searches are restricted to the
+    documents whose sha256 are in `sources`, when given.
+    """
+
+    vector_store: Any
+    keyword_index: Any
+    k: int = RETRIEVAL_K
+    fetch_k: int = RETRIEVAL_FETCH_K
+    rrf_k: int = RRF_K
+    sources: Optional[List[str]] = None
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        search_filter = {"sha256": {"$in": list(self.sources)}} if self.sources else None
+        dense = self.vector_store.similarity_search(query, k=self.fetch_k, filter=search_filter)
+        try:
+            sparse = [
+                Document(id=id, page_content=text, metadata=metadata)
+                for id, text, metadata in self.keyword_index.search(query, self.fetch_k, self.sources)
+            ]
+        except Exception as e:
+            # A broken keyword index degrades to plain vector search.
+            print(f"Keyword search failed: {e}")
+            sparse = []
+        return reciprocal_rank_fusion([dense, sparse], self.rrf_k)[:self.k]
@@ -0,0 +1,108 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from .vars import KEYWORD_INDEX_PATH
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def match_query(text: str, operator: str = "OR") -> Optional[str]:
+    """
+    Turn free text into an FTS5 query joining its terms with `operator`.
+    Each term is quoted, so punctuation and FTS operators in the prompt
+    cannot break it.
+    """
+    terms = dict.fromkeys(token.lower() for token in _TOKEN.findall(text))
+    if not terms:
+        return None
+    return f" {operator} ".join(f'"{term}"' for term in terms)
+
+
+class KeywordIndex:
+    """
+    BM25 keyword index over the ingested chunks, kept next to the Chroma
+    collection.
+
+    Chunks are stored in an SQLite FTS5 table under the same ids as in
+    Chroma, together with the sha256 of their document so searches can be
+    scoped the same way. Re-adding an id replaces its row.
+    """
+
+    def __init__(self, path: str = KEYWORD_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+                id UNINDEXED,
+                sha256 UNINDEXED,
+                metadata UNINDEXED,
+                content,
+                tokenize = 'porter unicode61'
+            )
+            """
+        )
+
+    def add(self, ids: Sequence[str], texts: Sequence[str], metadatas: Sequence[dict]) -> None:
+        rows = [
+            (id, metadata.get("sha256"), json.dumps(metadata), text)
+            for id, text, metadata in zip(ids, texts, metadatas)
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                # Stay well under SQLite's bound-parameter limit.
+                for start in range(0, len(ids), 500):
+                    batch = list(ids[start:start + 500])
+                    self._conn.execute(
+                        f"DELETE FROM chunks WHERE id IN ({','.join('?' * len(batch))})", batch
+                    )
+                self._conn.executemany(
+                    "INSERT INTO chunks (id, sha256, metadata, content) VALUES (?, ?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def search(
+        self, query: str, k: int, sources: Optional[Sequence[str]] = None
+    ) -> List[Tuple[str, str, dict]]:
+        """
+        Return up to `k` `(id, text, metadata)` matches, best BM25 score
+        first, restricted to the documents whose sha256 are in `sources`.
+        """
+        fts_query = match_query(query)
+        if fts_query is None:
+            return []
+        sql = "SELECT id, content, metadata FROM chunks WHERE chunks MATCH ?"
+        params: list = [fts_query]
+        if sources:
+            sql += f" AND sha256 IN ({','.join('?' * len(sources))})"
+            params.extend(sources)
+        sql += " ORDER BY bm25(chunks) LIMIT ?"
+        params.append(k)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [(id, content, json.loads(metadata)) for id, content, metadata in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+
+@lru_cache(maxsize=None)
+def get_keyword_index() -> KeywordIndex:
+    """Process-wide keyword index."""
+    return KeywordIndex()
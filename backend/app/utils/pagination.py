@@ -0,0 +1,50 @@
+import base64
+import binascii
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor",
+    )
+
+
+def _encode(value: str) -> str:
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> str:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return base64.urlsafe_b64decode(padded.encode()).decode()
+
+
+def encode_cursor(last_id: int) -> str:
+    """Opaque cursor pointing just past the row with `last_id`."""
+    return _encode(str(last_id))
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    if not cursor:
+        return None
+    try:
+        return int(_decode(cursor))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise _invalid_cursor()
+
+
+def encode_rank_cursor(rank: float, last_id: int) -> str:
+    """Cursor for results ordered by (rank, id), both descending."""
+    return _encode(f"{rank!r}:{last_id}")
+
+
+def decode_rank_cursor(cursor: Optional[str]) -> Optional[Tuple[float, int]]:
+    if not cursor:
+        return None
+    try:
+        rank, last_id = _decode(cursor).split(":")
+        return float(rank), int(last_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise _invalid_cursor()
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.config import config
+from .security import PasswordManager
+
+T = TypeVar("T")
+
+
+class PasswordHashPool:
+    """
+    Runs bcrypt on a small dedicated thread pool.
+
+    Each hash or check costs 100-300 ms of CPU. Inline, a burst of sign-ins
+    takes every slot of the shared threadpool and stalls unrelated requests.
+    bcrypt releases the GIL, so threads are enough to use several cores.
+    Jobs past `queue_limit` are rejected with a 503 instead of queueing
+    without bound.
+    """
+
+    def __init__(
+        self,
+        workers: int = config.PASSWORD_HASH_WORKERS,
+        queue_limit: int = config.PASSWORD_HASH_QUEUE_LIMIT,
+    ):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.active = 0
+        self.queued = 0
+        self.rejected = 0
+        self.completed = 0
+        self.total_wait_ms = 0.0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+
+    def _timed(self, enqueued_at: float, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+            self.total_wait_ms += (time.perf_counter() - enqueued_at) * 1000
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self.queued >= self.queue_limit:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many sign-in attempts in progress, please retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self.queued += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._timed, time.perf_counter(), fn, *args)
+
+    async def hash_password(self, password: str) -> str:
+        return await self.run(PasswordManager.hash_password, password)
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(PasswordManager.verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "active": self.active,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "avg_wait_ms": round(self.total_wait_ms / self.completed, 2) if self.completed else 0.0,
+        }
+
+
+password_pool = PasswordHashPool()
@@ -0,0 +1,219 @@
+"""
+Cache of generated notes and quizzes.
+
+Entries are keyed by the normalized prompt, the generation mode (rag/search)
+and the set of source documents. Only exact matches are served unless
+`RESPONSE_CACHE_SIMILARITY` is set above 0; then a prompt that misses the
+exact key can still reuse the response of a near-duplicate prompt in the
+same mode and document set.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, List, Optional
+
+from .category_index import cosine_similarity
+from .clients import get_embeddings
+from .vars import (
+    RESPONSE_CACHE_BACKEND,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_SIMILARITY,
+    RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_URL,
+)
+
+
+class InMemoryBackend:
+    """Per-process backend with TTL expiry and LRU eviction."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def add(self, key: str, value: str, ttl: int) -> bool:
+        """Set the key only if it is absent, returning whether it was set."""
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.time()
+            if entry is not None and entry[1] >= now:
+                return False
+            self._entries[key] = (value, now + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class RedisBackend:
+    """
+    Backend shared by every worker. Entries expire through Redis TTLs; LRU
+    eviction is left to the server's `maxmemory-policy`.
+    """
+
+    def __init__(self, url: str, prefix: str = "response-cache:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self.prefix + key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def add(self, key: str, value: str, ttl: int) -> bool:
+        return bool(self.client.set(self.prefix + key, value, ex=ttl, nx=True))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+
+def normalize_prompt(prompt: str) -> str:
+    prompt = re.sub(r"\s+", " ", prompt.lower()).strip()
+    return prompt.strip(" .!?")
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        backend,
+        ttl: int = RESPONSE_CACHE_TTL,
+        similarity: float = RESPONSE_CACHE_SIMILARITY,
+        max_similar_candidates: int = 200,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.similarity = similarity
+        self.max_similar_candidates = max_similar_candidates
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _scope(kind: str, mode: str, sources: Iterable[str]) -> str:
+        return f"{kind}|{mode}|{','.join(sorted(set(sources)))}"
+
+    @staticmethod
+    def _hash(value: str) -> str:
+        return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+    def _candidates(self, scope_key: str) -> List[list]:
+        raw = self.backend.get(scope_key)
+        return json.loads(raw) if raw else []
+
+    def get(self, kind: str, prompt: str, mode: str, sources: Iterable[str] = ()) -> Optional[Any]:
+        """Return the cached response for the prompt, or a near-duplicate's."""
+        try:
+            value = self._lookup(kind, prompt, mode, sources)
+        except Exception as e:
+            print(f"Response cache lookup failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        return value
+
+    def _lookup(self, kind: str, prompt: str, mode: str, sources: Iterable[str]) -> Optional[Any]:
+        scope = self._scope(kind, mode, sources)
+        normalized = normalize_prompt(prompt)
+        raw = self.backend.get(self._hash(f"{scope}|{normalized}"))
+        if raw is not None:
+            self.hits += 1
+            return json.loads(raw)
+
+        candidates = self._candidates(self._hash(scope)) if self.similarity > 0 else []
+        if not candidates:
+            return None
+        query = get_embeddings().embed_query(normalized)
+        best_score, best_key = max(
+            (cosine_similarity(query, vector), key) for key, vector in candidates
+        )
+        if best_score < self.similarity:
+            return None
+        raw = self.backend.get(best_key)
+        if raw is None:
+            return None
+        self.similar_hits += 1
+        return json.loads(raw)
+
+    def set(self, kind: str, prompt: str, mode: str, sources: Iterable[str], value: Any) -> None:
+        try:
+            self._store(kind, prompt, mode, sources, value)
+        except Exception as e:
+            print(f"Response cache not updated: {e}")
+
+    def _store(self, kind: str, prompt: str, mode: str, sources: Iterable[str], value: Any) -> None:
+        scope = self._scope(kind, mode, sources)
+        normalized = normalize_prompt(prompt)
+        key = self._hash(f"{scope}|{normalized}")
+        self.backend.set(key, json.dumps(value), self.ttl)
+
+        if self.similarity > 0:
+            scope_key = self._hash(scope)
+            vector = get_embeddings().embed_query(normalized)
+            candidates = [entry for entry in self._candidates(scope_key) if entry[0] != key]
+            candidates.append([key, vector])
+            self.backend.set(scope_key, json.dumps(candidates[-self.max_similar_candidates:]), self.ttl)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.similar_hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.similar_hits) / lookups if lookups else 0.0,
+        }
+
+
+class NullBackend:
+    def get(self, key: str) -> Optional[str]:
+        return None
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        pass
+
+    def add(self, key: str, value: str, ttl: int) -> bool:
+        return True
+
+    def delete(self, key: str) -> None:
+        pass
+
+
+def build_backend(name: str = RESPONSE_CACHE_BACKEND, prefix: str = "response-cache:"):
+    if name == "redis" and RESPONSE_CACHE_URL:
+        return RedisBackend(RESPONSE_CACHE_URL, prefix=prefix)
+    if name == "none":
+        return NullBackend()
+    return InMemoryBackend()
+
+
+response_cache = ResponseCache(build_backend())
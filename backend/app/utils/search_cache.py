@@ -0,0 +1,148 @@
+"""
+TTL cache for web search results.
+
+A note and a quiz on the same topic usually search for the same query, and
+every Tavily call is billed and slow. Results are cached by normalized query
+in the response cache backends, so the "redis" backend shares them across
+workers. Concurrent identical queries are coalesced into a single outbound
+call: inside a process, followers wait on the leader's future; across
+workers, through a short-lived marker key set with `add`. No lock is held
+while searching or waiting, so unrelated queries never queue behind each
+other.
+"""
+import json
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+from .response_cache import build_backend, normalize_prompt
+from .vars import SEARCH_CACHE_BACKEND, SEARCH_CACHE_LOCK_TIMEOUT, SEARCH_CACHE_TTL
+
+
+class SearchCache:
+    def __init__(self, backend, ttl: int = SEARCH_CACHE_TTL, lock_timeout: float = SEARCH_CACHE_LOCK_TIMEOUT):
+        self.backend = backend
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.hits = 0
+        self.misses = 0
+        # Searches in flight in this process, by key. The lock only guards the dict.
+        self._in_flight: Dict[str, Future] = {}
+        self._in_flight_lock = threading.Lock()
+
+    def _read(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.backend.get(key)
+        except Exception as e:
+            print(f"Search cache lookup failed: {e}")
+            return None
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    def _write(self, key: str, results: Any) -> None:
+        try:
+            self.backend.set(key, json.dumps(results), self.ttl)
+        except Exception as e:
+            print(f"Search cache not updated: {e}")
+
+    def _wait_for_other_worker(self, key: str) -> Optional[Any]:
+        """Poll for the result of a search another worker has in flight."""
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.1)
+            results = self._read(key)
+            if results is not None:
+                return results
+            try:
+                pending = self.backend.get(f"{key}:pending")
+            except Exception as e:
+                print(f"Search cache lookup failed: {e}")
+                return None
+            if pending is None:
+                break
+        return None
+
+    def fetch(self, namespace: str, query: str, search: Callable[[str], Any]) -> Any:
+        """
+        Return cached results for the query, calling `search(query)` on a
+        miss. Results must be JSON serializable.
+        """
+        key = f"{namespace}|{normalize_prompt(query)}"
+        results = self._read(key)
+        if results is not None:
+            self.hits += 1
+            return results
+
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+
+        if not leader:
+            try:
+                results = future.result(timeout=self.lock_timeout)
+            except FutureTimeoutError:
+                # The leader is stuck; search directly rather than keep waiting.
+                self.misses += 1
+                return search(query)
+            self.hits += 1
+            return results
+
+        try:
+            results = self._fetch_once(key, query, search)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(results)
+            return results
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(key, None)
+
+    def _fetch_once(self, key: str, query: str, search: Callable[[str], Any]) -> Any:
+        """Search as this process's leader for the key, coalescing with other workers."""
+        # A search for the key may have finished since the first lookup.
+        results = self._read(key)
+        if results is not None:
+            self.hits += 1
+            return results
+
+        pending = f"{key}:pending"
+        try:
+            worker_leader = self.backend.add(pending, "1", max(1, int(self.lock_timeout)))
+        except Exception as e:
+            print(f"Search cache lock failed: {e}")
+            worker_leader = True
+        if not worker_leader:
+            results = self._wait_for_other_worker(key)
+            if results is not None:
+                self.hits += 1
+                return results
+
+        self.misses += 1
+        try:
+            results = search(query)
+            self._write(key, results)
+        finally:
+            if worker_leader:
+                try:
+                    self.backend.delete(pending)
+                except Exception:
+                    pass
+        return results
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+search_cache = SearchCache(build_backend(SEARCH_CACHE_BACKEND, prefix="search-cache:"))
@@ -13,7 +13,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 class PasswordManager:
     @classmethod
     def hash_password(cls, password: str) -> str:
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(rounds=config.BCRYPT_ROUNDS)
         hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
         return hashed_password.decode('utf-8')
 
@@ -21,6 +21,15 @@ class PasswordManager:
     def verify_password(cls, plain_password: str, hashed_password: str) -> bool:
         return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
+    @classmethod
+    def needs_rehash(cls, hashed_password: str) -> bool:
+        """Whether the hash was made with a cost other than `BCRYPT_ROUNDS`."""
+        try:
+            rounds = int(hashed_password.split('$')[2])
+        except (IndexError, ValueError):
+            return True
+        return rounds != config.BCRYPT_ROUNDS
+
 
 class JWTManager:
     @staticmethod
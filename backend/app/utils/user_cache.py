@@ -0,0 +1,170 @@
+"""
+Short-lived cache of authenticated users.
+
+`get_current_user` runs on every request, so the user row, minus its
+password hash, is kept as a snapshot for `USER_CACHE_TTL` seconds: first in a per-process LRU, then, with
+`USER_CACHE_REDIS_URL` set, in Redis shared by all workers. Snapshots are
+dropped whenever the user row is updated or deleted.
+"""
+import json
+from datetime import date, datetime
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import config
+from app.models import User
+from .response_cache import InMemoryBackend, RedisBackend
+
+
+# Never cached: the bcrypt hash has no business in a shared cache.
+EXCLUDED_FIELDS = ["password_hash"]
+
+
+class CachedUser:
+    """
+    Read-only view of a user built from a snapshot. It is not mapped, so it
+    cannot be added to a session or mistaken for a loaded row; fetch the
+    `User` through `UserService` to change it.
+    """
+    __slots__ = ("_data",)
+
+    def __init__(self, data: dict):
+        object.__setattr__(self, "_data", data)
+
+    def __getattr__(self, name: str):
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError("Cached users are read-only")
+
+    def to_dict(self, *, exclude: Optional[list] = None, only: Optional[list] = None) -> dict:
+        if only is not None:
+            return {name: value for name, value in self._data.items() if name in only}
+        if exclude is not None:
+            return {name: value for name, value in self._data.items() if name not in exclude}
+        return dict(self._data)
+
+
+def snapshot(user: User) -> str:
+    return json.dumps(user.to_dict(exclude=EXCLUDED_FIELDS), default=lambda value: value.isoformat())
+
+
+def restore(raw: str) -> CachedUser:
+    """Rebuild a `CachedUser` from a snapshot, without touching the database."""
+    data = json.loads(raw)
+    for column in User.__table__.columns:
+        value = data.get(column.name)
+        if value is None:
+            continue
+        if isinstance(column.type, sa.DateTime):
+            data[column.name] = datetime.fromisoformat(value)
+        elif isinstance(column.type, sa.Date):
+            data[column.name] = date.fromisoformat(value)
+    return CachedUser(data)
+
+
+class UserCache:
+    def __init__(
+        self,
+        ttl: int = config.USER_CACHE_TTL,
+        max_entries: int = config.USER_CACHE_MAX_ENTRIES,
+        redis_url: Optional[str] = config.USER_CACHE_REDIS_URL,
+    ):
+        self.ttl = ttl
+        self.local = InMemoryBackend(max_entries)
+        self.shared = RedisBackend(redis_url, prefix="user-cache:") if redis_url else None
+        self.hits = 0
+        self.misses = 0
+
+    def get_local(self, user_id: int) -> Optional[CachedUser]:
+        """Look the user up in this process only, cheap enough for the event loop."""
+        raw = self.local.get(str(user_id))
+        if raw is None:
+            return None
+        self.hits += 1
+        return restore(raw)
+
+    def get(self, user_id: int) -> Optional[CachedUser]:
+        """Look the user up locally, then in the shared tier. Blocking."""
+        user = self.get_local(user_id)
+        if user is not None or self.shared is None:
+            return user
+        try:
+            raw = self.shared.get(str(user_id))
+        except Exception as e:
+            print(f"User cache lookup failed: {e}")
+            return None
+        if raw is None:
+            return None
+        self.hits += 1
+        self.local.set(str(user_id), raw, self.ttl)
+        return restore(raw)
+
+    def set(self, user: User) -> CachedUser:
+        """Cache a snapshot of the user and return it, as callers would read it back."""
+        raw = snapshot(user)
+        self.local.set(str(user.id), raw, self.ttl)
+        if self.shared is not None:
+            try:
+                self.shared.set(str(user.id), raw, self.ttl)
+            except Exception as e:
+                print(f"User cache not updated: {e}")
+        return restore(raw)
+
+    def invalidate(self, user_id: int) -> None:
+        self.local.delete(str(user_id))
+        if self.shared is not None:
+            try:
+                self.shared.delete(str(user_id))
+            except Exception as e:
+                print(f"User cache not invalidated: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.shared or self.local).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+user_cache = UserCache()
+
+
+def mark_stale(session: Session, user_id: int) -> None:
+    """
+    Drop the user's snapshot now and again once the session commits, so a
+    request racing the transaction cannot cache the old row for a full TTL.
+    """
+    user_cache.invalidate(user_id)
+    session.info.setdefault("stale_users", set()).add(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target: User) -> None:
+    # Flushes through the ORM (e.g. setting `user.password`) land here; bulk
+    # updates go through `UserService.update`/`delete`, which mark them too.
+    session = Session.object_session(target)
+    if session is None:
+        user_cache.invalidate(target.id)
+    else:
+        mark_stale(session, target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for user_id in session.info.pop("stale_users", ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session: Session) -> None:
+    session.info.pop("stale_users", None)
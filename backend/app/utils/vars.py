@@ -14,4 +14,54 @@ CHROMA_DB_PATH = "/home/aishik/Documents/Programming/Hackathons/Hack4Bengal2025/
 # Collection name within Chroma DB (ensure consistency with main.py)
 CHROMA_COLLECTION_NAME = "documents"
 # Interval to check for new files (in seconds)
-CHECK_INTERVAL = 10
\ No newline at end of file
+CHECK_INTERVAL = 10
+# Number of chunks sent to the embedding backend per request
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 64))
+# Maximum number of embedding requests in flight at once
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", 4))
+# SQLite file holding cached embeddings, keyed by model and chunk hash
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", os.path.join(os.getcwd(), "db", "embedding_cache.sqlite3"))
+# Least recently used embeddings are evicted beyond this many entries
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", 200_000))
+# Minimum cosine similarity for a prompt to be filed under an existing category
+CATEGORY_MATCH_THRESHOLD = float(os.getenv("CATEGORY_MATCH_THRESHOLD", 0.75))
+# Maximum number of existing categories assigned to a prompt
+CATEGORY_MAX_MATCHES = int(os.getenv("CATEGORY_MAX_MATCHES", 3))
+# Generated note/quiz cache: "memory" (per process), "redis" or "none"
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+# Redis URL for the "redis" backend, defaults to the Celery broker
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL") or os.getenv("CELERY_BROKER_URL")
+# Seconds a generated response stays reusable
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", 24 * 60 * 60))
+# Least recently used responses are evicted beyond this many entries
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1000))
+# Cosine similarity for reusing a near-duplicate prompt's response, e.g. 0.95.
+# Off (0) by default: only exact prompt matches are served from the cache.
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", 0))
+# Cache backend for web search results ("memory", "redis" or "none")
+SEARCH_CACHE_BACKEND = os.getenv("SEARCH_CACHE_BACKEND", RESPONSE_CACHE_BACKEND)
+# Seconds a web search result stays reusable
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", 6 * 60 * 60))
+# Seconds to wait for another worker's in-flight search before searching ourselves
+SEARCH_CACHE_LOCK_TIMEOUT = float(os.getenv("SEARCH_CACHE_LOCK_TIMEOUT", 15))
+# SQLite file holding the BM25 keyword index kept next to the Chroma collection
+KEYWORD_INDEX_PATH = os.getenv("KEYWORD_INDEX_PATH", os.path.join(os.getcwd(), "db", "keyword_index.sqlite3"))
+# Candidates fetched from each of the keyword and vector searches before fusion
+RETRIEVAL_FETCH_K = int(os.getenv("RETRIEVAL_FETCH_K", 10))
+# Chunks kept after reciprocal rank fusion
+RETRIEVAL_K = int(os.getenv("RETRIEVAL_K", 5))
+# Reciprocal rank fusion damping constant
+RRF_K = int(os.getenv("RRF_K", 60))
+# Token budget for the retrieved context of the note writer
+WRITER_CONTEXT_TOKENS = int(os.getenv("WRITER_CONTEXT_TOKENS", 3000))
+# Token budget for the retrieved context of the quiz generator
+QUIZ_CONTEXT_TOKENS = int(os.getenv("QUIZ_CONTEXT_TOKENS", 2000))
+# Word-shingle Jaccard similarity above which two passages count as duplicates
+CONTEXT_DUPLICATE_THRESHOLD = float(os.getenv("CONTEXT_DUPLICATE_THRESHOLD", 0.8))
+# Maximum AI generations (notes and quizzes) running at once per API process
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", 8))
+# Seconds a generation request waits for a free slot before getting a 503
+AI_QUEUE_TIMEOUT = float(os.getenv("AI_QUEUE_TIMEOUT", 30))
+# Build every AI backend in the background when an API process starts,
+# instead of on the first request that needs it
+AI_WARM_ON_STARTUP = os.getenv("AI_WARM_ON_STARTUP", "false").lower() in ("1", "true", "yes")
@@ -0,0 +1,47 @@
+"""
+Backfill the BM25 keyword index from the Chroma collection.
+
+Chunks ingested before hybrid retrieval existed are only in Chroma, so they
+can only be found by vector search. This copies every chunk (id, text and
+metadata) into the keyword index; re-running it is harmless.
+
+    $ uv run python scripts/backfill_keyword_index.py [--batch-size 1000]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.utils.clients import get_vector_store  # noqa: E402
+from app.utils.keyword_index import get_keyword_index  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    collection = get_vector_store()._collection
+    keyword_index = get_keyword_index()
+    offset = 0
+    while True:
+        batch = collection.get(
+            include=["documents", "metadatas"], limit=args.batch_size, offset=offset
+        )
+        if not batch["ids"]:
+            break
+        keyword_index.add(
+            batch["ids"],
+            batch["documents"],
+            [metadata or {} for metadata in batch["metadatas"]],
+        )
+        offset += len(batch["ids"])
+        print(f"Indexed {offset} chunks")
+
+    print(f"Keyword index holds {keyword_index.count()} chunks")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Benchmark list queries with and without the partial `*_creator_id_active`
+indexes.
+
+Seeds a scratch database where one user owns half of every table and most of
+those rows are soft-deleted, then times `BaseService.list` for that user,
+first page and a deep keyset page, with the index dropped and then created,
+and prints the query plan of each.
+
+    $ uv run python scripts/benchmark_list_indexes.py --database-url postgresql://.../scratch [--rows 2000000]
+
+Never point it at a database you care about: its tables are dropped and
+recreated. SQLite URLs work too, which is handy for a quick look at the plans.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Columns each table needs besides the shared owner / soft-delete ones.
+FILLERS = {
+    "notes": {"title": "'Note ' || i", "content": "'body'"},
+    "quizzes": {"title": "'Quiz ' || i", "content": "'body'"},
+    "categories": {"name": "'Category ' || i"},
+    "collections": {"name": "'Collection ' || i"},
+    "quiz_questions": {"question_type": "'mcq'", "question": "'Question ' || i"},
+}
+
+
+def series(dialect: str) -> tuple:
+    """(prefix, source) of a SELECT over i = 1..:rows."""
+    if dialect == "postgresql":
+        return "", "generate_series(1, :rows) AS s(i)"
+    return "WITH RECURSIVE s(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM s WHERE i < :rows) ", "s"
+
+
+def seed(engine, rows: int, users: int, deleted_percent: int) -> None:
+    from sqlalchemy import text
+
+    prefix, source = series(engine.dialect.name)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                f"{prefix}INSERT INTO users (first_name, email, username, password_hash, is_active, is_deleted) "
+                f"SELECT 'User ' || i, 'user' || i || '@example.com', 'user' || i, 'x', true, false FROM {source}"
+            ),
+            {"rows": users},
+        )
+        for table, fillers in FILLERS.items():
+            columns = ", ".join(fillers)
+            values = ", ".join(fillers.values())
+            # Every other row belongs to user 1, the rest are spread out.
+            conn.execute(
+                text(
+                    f"{prefix}INSERT INTO {table} ({columns}, creator_id, is_deleted, is_active, created_at, updated_at) "
+                    f"SELECT {values}, CASE WHEN i % 2 = 0 THEN 1 ELSE 2 + i % {users - 1} END, "
+                    f"(i / 2 * 7919) % 100 < {deleted_percent}, true, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP FROM {source}"
+                ),
+                {"rows": rows},
+            )
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+        conn.commit()
+
+
+def explain(engine, statement: str, parameters) -> str:
+    prefix = "EXPLAIN (ANALYZE, BUFFERS) " if engine.dialect.name == "postgresql" else "EXPLAIN QUERY PLAN "
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(prefix + statement, parameters).all()
+    return "\n".join("    " + " | ".join(str(value) for value in row) for row in plan)
+
+
+def measure(engine, session_factory, service_class, before_id, runs: int) -> tuple:
+    """Median milliseconds of a page for user 1, and the plan of its query."""
+    from sqlalchemy import event
+
+    captured = {}
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured["statement"], captured["parameters"] = statement, parameters
+
+    event.listen(engine, "before_cursor_execute", capture)
+    timings = []
+    try:
+        for _ in range(runs):
+            with session_factory() as session:
+                started = time.perf_counter()
+                service_class(session).list({"creator_id": 1}, limit=101, before_id=before_id)
+                timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return statistics.median(timings), explain(engine, captured["statement"], captured["parameters"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="Scratch database to seed")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Rows per table")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--deleted-percent", type=int, default=90, help="Share of soft-deleted rows")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ["SQLALCHEMY_DATABASE_URI"] = args.database_url
+    os.environ.pop("SQLALCHEMY_ASYNC_DATABASE_URI", None)
+    os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+    os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    from app.dependencies.db import SessionLocal, engine
+    from app.models import Base
+    from app.services import CategoryService, CollectionService, NoteService, QuizQuestionService, QuizService
+
+    services = {
+        "notes": NoteService,
+        "quizzes": QuizService,
+        "categories": CategoryService,
+        "collections": CollectionService,
+        "quiz_questions": QuizQuestionService,
+    }
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    started = time.perf_counter()
+    seed(engine, args.rows, args.users, args.deleted_percent)
+    print(f"Seeded {args.rows:,} rows into each of {len(services)} tables in {time.perf_counter() - started:.1f}s\n")
+
+    for table, service_class in services.items():
+        index = next(ix for ix in Base.metadata.tables[table].indexes if ix.name == f"ix_{table}_creator_id_active")
+        pages = {"first page": None, "deep page": args.rows // 2}
+        for state in ("without", "with"):
+            if state == "without":
+                index.drop(engine)
+            else:
+                index.create(engine)
+            with engine.connect() as conn:
+                conn.exec_driver_sql(f"ANALYZE {table}")
+                conn.commit()
+            for page, before_id in pages.items():
+                median, plan = measure(engine, SessionLocal, service_class, before_id, args.runs)
+                print(f"{table:<15} {page:<10} {state:<7} index: {median:8.2f} ms")
+                print(plan)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Import-time budget for the API process.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter and
+fails when importing the app takes longer than the budget, or when any of the
+AI / worker packages are pulled into the web import graph. Those must only be
+imported on demand by the handlers that need them.
+
+    $ uv run python scripts/check_import_time.py [--budget-ms 1500] [--runs 3]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_BUDGET_MS = int(os.getenv("IMPORT_TIME_BUDGET_MS", 1500))
+
+FORBIDDEN_PACKAGES = (
+    "langchain",
+    "langchain_core",
+    "langchain_community",
+    "langchain_groq",
+    "langchain_ollama",
+    "langchain_chroma",
+    "langchain_text_splitters",
+    "chromadb",
+    "groq",
+    "tavily",
+    "pypdf",
+    "celery",
+    "crewai",
+    "llama_index",
+    "agno",
+    "lancedb",
+)
+
+
+def measure(module: str) -> dict:
+    """Return {module name: cumulative import time in microseconds}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=int, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="best of N runs is compared to the budget")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    best = min(runs, key=lambda timings: timings[args.module])
+    total_ms = best[args.module] / 1000
+
+    print(f"import {args.module}: {total_ms:.0f} ms (budget {args.budget_ms} ms, best of {args.runs})")
+    top_level = {}
+    for name, cumulative in best.items():
+        root = name.split(".")[0]
+        top_level[root] = max(top_level.get(root, 0), cumulative)
+    for root, cumulative in sorted(top_level.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {cumulative / 1000:8.1f} ms  {root}")
+
+    failed = False
+    leaked = sorted({name for name in best if name.split(".")[0] in FORBIDDEN_PACKAGES})
+    if leaked:
+        failed = True
+        print("\nAI / worker packages imported at startup:")
+        for name in leaked[:20]:
+            print(f"  {name}")
+    if total_ms > args.budget_ms:
+        failed = True
+        print(f"\nImport time {total_ms:.0f} ms is over the {args.budget_ms} ms budget.")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
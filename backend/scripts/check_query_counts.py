@@ -0,0 +1,115 @@
+"""
+SQL statement budget for the read endpoints.
+
+Seeds a throwaway database with notes, categories, collections and quizzes,
+calls each endpoint through the app and fails when it runs more statements
+than its budget. Catches relationships loaded per row or cascading eager
+loads sneaking back into list and detail views.
+
+    $ uv run python scripts/check_query_counts.py [--database-url URL]
+
+The default database is a temporary SQLite file. Never point `--database-url`
+at a database you care about: its tables are dropped and recreated.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# (path, statements allowed); ids refer to the rows made by `seed`.
+BUDGETS = [
+    ("/api/notes/list", 2),
+    ("/api/notes/list/summary", 2),
+    ("/api/notes/search?q=body", 1),
+    ("/api/notes/1", 2),
+    ("/api/categories/list", 1),
+    ("/api/collections/list", 1),
+    ("/api/quizzes/list", 1),
+    ("/api/quizzes/1/view", 2),
+]
+
+
+def seed(session) -> None:
+    from app.models import Category, Collection, Note, Quiz, QuizQuestion, User
+
+    user = User(id=1, first_name="Query", email="queries@example.com", username="queries", password_hash="x")
+    session.add(user)
+    collections = [Collection(name=f"Collection {i}", creator_id=1) for i in range(3)]
+    categories = [Category(name=f"Category {i}", creator_id=1) for i in range(5)]
+    session.add_all(collections + categories)
+    for i in range(20):
+        session.add(
+            Note(
+                title=f"Note {i}",
+                content="body " * 200,
+                creator_id=1,
+                collection=collections[i % 3],
+                categories=categories[i % 5:i % 5 + 3],
+            )
+        )
+    for i in range(5):
+        quiz = Quiz(title=f"Quiz {i}", creator_id=1, collection=collections[i % 3])
+        quiz.questions = [
+            QuizQuestion(question_type="mcq", question=f"Question {j}", options=["a", "b"], answer="a", creator_id=1)
+            for j in range(10)
+        ]
+        session.add(quiz)
+    session.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Scratch database to seed (default: temporary SQLite)")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/query_counts.db"
+    os.environ["SQLALCHEMY_DATABASE_URI"] = database_url
+    os.environ.pop("SQLALCHEMY_ASYNC_DATABASE_URI", None)
+    os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+    os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    from app.dependencies.db import SessionLocal, async_engine, engine
+    from app.main import app
+    from app.models import Base
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as session:
+        seed(session)
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "before_cursor_execute", count)
+
+    failures = 0
+    with TestClient(app) as client:
+        # The first request caches the signed-in user, which is not counted.
+        client.get("/api/user/profile")
+        for path, budget in BUDGETS:
+            statements.clear()
+            response = client.get(path)
+            used = len(statements)
+            ok = response.status_code == 200 and used <= budget
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {path:<24} {used:>3} statements (budget {budget}, HTTP {response.status_code})")
+            if not ok:
+                for statement in statements:
+                    print(f"       {' '.join(statement.split())[:120]}")
+
+    if failures:
+        sys.exit(f"{failures} endpoint(s) over their statement budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ import { FaArrowLeft, FaTimes, FaSave, FaTrash, FaRobot, FaTags, FaFilePdf, FaUp
 import GenericModal from './GenericModal';
 
 const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api';
+const INGESTION_POLL_INTERVAL = 2000;
 
 const NoteEditor = () => {
     const { id } = useParams();
@@ -177,6 +178,22 @@ const NoteEditor = () => {
         setFiles(updatedFiles);
     };
 
+    // Uploaded files are ingested in the background; wait for the job
+    // before generating from them.
+    const waitForIngestion = async (jobId, headers) => {
+        for (;;) {
+            const response = await axios.get(`${API_URL}/documents/jobs/${jobId}`, { headers });
+            const job = response.data.data;
+            if (job.state === 'SUCCESS') {
+                return job;
+            }
+            if (job.state === 'FAILURE' || job.state === 'REVOKED') {
+                throw new Error('Failed to process the uploaded files');
+            }
+            await new Promise((resolve) => setTimeout(resolve, INGESTION_POLL_INTERVAL));
+        }
+    };
+
     const generateAiNote = async () => {
         if (!userPrompt) {
             setGenerationError('Please enter a prompt for the AI.');
@@ -188,27 +205,39 @@ const NoteEditor = () => {
 
         try {
             const token = localStorage.getItem('token');
+            const headers = { Authorization: token ? `Bearer ${token}` : '' };
+
+            const submit = (fileIds) => {
+                const formData = new FormData();
+                formData.append('user_prompt_input', userPrompt);
+                formData.append('rag_enabled', files.length > 0 ? 'true' : 'false');
+
+                if (fileIds) {
+                    fileIds.forEach((fileId) => formData.append('file_ids', fileId));
+                } else {
+                    // Append files if any
+                    for (let i = 0; i < files.length; i++) {
+                        formData.append('files', files[i]);
+                    }
+                }
 
-            const formData = new FormData();
-            formData.append('user_prompt_input', userPrompt);
-            formData.append('rag_enabled', files.length > 0 ? 'true' : 'false');
+                return axios.post(
+                    `${API_URL}/notes/create-ai-note`,
+                    formData,
+                    {
+                        headers: { ...headers, 'Content-Type': 'multipart/form-data' }
+                    }
+                );
+            };
 
-            // Append files if any
-            for (let i = 0; i < files.length; i++) {
-                formData.append('files', files[i]);
+            let response = await submit();
+            if (response.status === 202) {
+                // Files were queued; generate once they have been ingested.
+                const { job_id: jobId, file_ids: fileIds } = response.data.data;
+                await waitForIngestion(jobId, headers);
+                response = await submit(fileIds);
             }
 
-            const response = await axios.post(
-                `${API_URL}/notes/create-ai-note`,
-                formData,
-                {
-                    headers: {
-                        Authorization: token ? `Bearer ${token}` : '',
-                        'Content-Type': 'multipart/form-data'
-                    }
-                }
-            );
-
             if (response.data && response.data.success) {
                 const generatedNote = response.data.data;
                 console.log('Generated note:', generatedNote); // Debug log
@@ -27,7 +27,7 @@ const NotesListPage = () => {
         setError(null);
         try {
             const token = localStorage.getItem('token');
-            const response = await axios.get(`${API_URL}/notes/list`, {
+            const response = await axios.get(`${API_URL}/notes/list/summary`, {
                 headers: { Authorization: token ? `Bearer ${token}` : '' }
             });
             setNotes(response.data.data || []);
@@ -181,7 +181,7 @@ const NotesListPage = () => {
                                     {formatDate(note.updated_at || note.created_at)}
                                 </Card.Subtitle>
                                 <Card.Text className="flex-grow-1 mb-3">
-                                    {truncateContent(note.content)}
+                                    {truncateContent(note.excerpt)}
                                 </Card.Text>
                                 {note.categories && note.categories.length > 0 && (
                                     <div className="note-categories mt-auto">
@@ -6,6 +6,7 @@ import { useNavigate, useParams } from 'react-router-dom';
 import '../styles/QuizGenerator.css';
 
 const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api';
+const INGESTION_POLL_INTERVAL = 2000;
 
 const QuizGenerator = () => {
     const navigate = useNavigate();
@@ -73,6 +74,22 @@ const QuizGenerator = () => {
         setFiles(updatedFiles);
     };
 
+    // Uploaded files are ingested in the background; wait for the job
+    // before generating from them.
+    const waitForIngestion = async (jobId, headers) => {
+        for (;;) {
+            const response = await axios.get(`${API_URL}/documents/jobs/${jobId}`, { headers });
+            const job = response.data.data;
+            if (job.state === 'SUCCESS') {
+                return job;
+            }
+            if (job.state === 'FAILURE' || job.state === 'REVOKED') {
+                throw new Error('Failed to process the uploaded files');
+            }
+            await new Promise((resolve) => setTimeout(resolve, INGESTION_POLL_INTERVAL));
+        }
+    };
+
     const generateQuiz = async () => {
         if (!userPrompt) {
             setGenerationError('Please enter a prompt for the AI.');
@@ -84,24 +101,37 @@ const QuizGenerator = () => {
 
         try {
             const token = localStorage.getItem('token');
-            const formData = new FormData();
-            formData.append('user_prompt_input', userPrompt);
-            formData.append('rag_enabled', files.length > 0 ? 'true' : 'false');
-
-            for (let i = 0; i < files.length; i++) {
-                formData.append('files', files[i]);
-            }
-
-            const response = await axios.post(
-                `${API_URL}/quizzes/create`,
-                formData,
-                {
-                    headers: {
-                        Authorization: token ? `Bearer ${token}` : '',
-                        'Content-Type': 'multipart/form-data'
+            const headers = { Authorization: token ? `Bearer ${token}` : '' };
+
+            const submit = (fileIds) => {
+                const formData = new FormData();
+                formData.append('user_prompt_input', userPrompt);
+                formData.append('rag_enabled', files.length > 0 ? 'true' : 'false');
+
+                if (fileIds) {
+                    fileIds.forEach((fileId) => formData.append('file_ids', fileId));
+                } else {
+                    for (let i = 0; i < files.length; i++) {
+                        formData.append('files', files[i]);
                     }
                 }
-            );
+
+                return axios.post(
+                    `${API_URL}/quizzes/create`,
+                    formData,
+                    {
+                        headers: { ...headers, 'Content-Type': 'multipart/form-data' }
+                    }
+                );
+            };
+
+            let response = await submit();
+            if (response.status === 202) {
+                // Files were queued; generate once they have been ingested.
+                const { job_id: jobId, file_ids: fileIds } = response.data.data;
+                await waitForIngestion(jobId, headers);
+                response = await submit(fileIds);
+            }
 
             if (response.data && response.data.success) {
                 navigate('/quizzes');